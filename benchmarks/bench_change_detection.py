@@ -0,0 +1,260 @@
+"""Scale benchmark for the State updated change detection hot path.
+
+Sets up 100, 1,000 and 10,000 State updated config entries on a local Home
+Assistant test instance, drives synthetic state_changed streams through the
+helpers and reports, per size:
+
+    events_per_second       source state changes handled per second
+    latency_p50_ms/p99_ms   event to async_write_ha_state
+    config_entry_writes_per_second
+    store_writes            runtime store writes during the stream
+    timer_wakeups           loop timer callbacks run while idle
+    setup_seconds           time to set up all entries
+    memory_per_helper_kib   traced memory per helper after setup
+
+Requires pytest-homeassistant-custom-component, no network is used.
+
+    python benchmarks/bench_change_detection.py --sizes 100 1000 --output out.json
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from statistics import quantiles
+import sys
+from time import perf_counter
+import tracemalloc
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.state_updated.binary_sensor import (  # noqa: E402
+    StateUpdatedBinarySensor,
+)
+from custom_components.state_updated.const import (  # noqa: E402
+    CONF_CLEAR_UPDATES_AFTER_MINUTES,
+    CONF_TEXT_TEMPLATE,
+    DOMAIN,
+)
+from custom_components.state_updated.runtime_store import (  # noqa: E402
+    async_get_runtime_store,
+)
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_EVENTS = 5000
+DEFAULT_IDLE_SECONDS = 5.0
+TEXT_TEMPLATE = (
+    "Entity {{ entity_id }} state changed from {{ old_value }} to {{ new_value }}."
+)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class Probe:
+    """Counters patched into the integration and the loop."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.pending: dict[tuple[str, str], float] = {}
+        self.latencies: list[float] = []
+        self.config_entry_writes: int = 0
+        self.timer_wakeups: int = 0
+
+
+# ------------------------------------------------------------------
+def install_probe(hass: HomeAssistant, probe: Probe) -> None:
+    """Patch state writes, config entry updates and loop timers."""
+
+    orig_write = StateUpdatedBinarySensor.__dict__.get(
+        "_bench_orig_write", StateUpdatedBinarySensor.async_write_ha_state
+    )
+    StateUpdatedBinarySensor._bench_orig_write = orig_write  # noqa: SLF001
+
+    def async_write_ha_state(entity: StateUpdatedBinarySensor) -> None:
+        orig_write(entity)
+
+        if (
+            start := probe.pending.pop(
+                (
+                    entity.entry.options["entity_id"],
+                    str(entity.component_api.new_value),
+                ),
+                None,
+            )
+        ) is not None:
+            probe.latencies.append(perf_counter() - start)
+
+    StateUpdatedBinarySensor.async_write_ha_state = async_write_ha_state
+
+    orig_update_entry = hass.config_entries.async_update_entry
+
+    def async_update_entry(*args: Any, **kwargs: Any) -> bool:
+        probe.config_entry_writes += 1
+        return orig_update_entry(*args, **kwargs)
+
+    hass.config_entries.async_update_entry = async_update_entry
+
+    orig_call_at = hass.loop.call_at
+
+    def call_at(when: float, callback: Any, *args: Any, **kwargs: Any) -> Any:
+        def counted(*cb_args: Any) -> None:
+            probe.timer_wakeups += 1
+            callback(*cb_args)
+
+        return orig_call_at(when, counted, *args, **kwargs)
+
+    hass.loop.call_at = call_at
+
+
+# ------------------------------------------------------------------
+async def async_run_size(
+    size: int, events: int, fanout: int, idle_seconds: float
+) -> dict[str, Any]:
+    """Run the benchmark for one number of helpers."""
+
+    sources: list[str] = [
+        f"sensor.bench_{index}" for index in range(max(size // fanout, 1))
+    ]
+
+    async with async_test_home_assistant() as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+        for source in sources:
+            hass.states.async_set(source, "0")
+
+        probe = Probe()
+        install_probe(hass, probe)
+
+        entries: list[MockConfigEntry] = []
+
+        for index in range(size):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title=f"bench {index}",
+                options={
+                    "entity_id": sources[index % len(sources)],
+                    CONF_CLEAR_UPDATES_AFTER_MINUTES: 10,
+                    CONF_TEXT_TEMPLATE: TEXT_TEMPLATE,
+                },
+            )
+            entry.add_to_hass(hass)
+            entries.append(entry)
+
+        tracemalloc.start()
+        memory_before: int = tracemalloc.get_traced_memory()[0]
+        setup_start: float = perf_counter()
+
+        for entry in entries:
+            await hass.config_entries.async_setup(entry.entry_id)
+
+        await hass.async_block_till_done()
+        setup_seconds: float = perf_counter() - setup_start
+        memory_after: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        runtime_store = async_get_runtime_store(hass)
+        store_writes_before: int = runtime_store.writes
+        config_entry_writes_before: int = probe.config_entry_writes
+
+        stream_start: float = perf_counter()
+
+        for index in range(events):
+            source: str = sources[index % len(sources)]
+            value: str = str(index + 1)
+            probe.pending[(source, value)] = perf_counter()
+            hass.states.async_set(source, value)
+
+            if index % 100 == 99:
+                await hass.async_block_till_done()
+
+        await hass.async_block_till_done()
+        stream_seconds: float = perf_counter() - stream_start
+
+        await runtime_store.async_flush()
+
+        probe.timer_wakeups = 0
+        await asyncio.sleep(idle_seconds)
+        idle_wakeups: int = probe.timer_wakeups
+
+        latencies_ms: list[float] = sorted(value * 1000 for value in probe.latencies)
+        percentiles: list[float] = (
+            quantiles(latencies_ms, n=100) if len(latencies_ms) > 1 else [0.0] * 99
+        )
+
+        result: dict[str, Any] = {
+            "helpers": size,
+            "sources": len(sources),
+            "events": events,
+            "events_per_second": round(events / stream_seconds, 1),
+            "latency_p50_ms": round(percentiles[49], 4),
+            "latency_p99_ms": round(percentiles[98], 4),
+            "config_entry_writes_per_second": round(
+                (probe.config_entry_writes - config_entry_writes_before)
+                / stream_seconds,
+                2,
+            ),
+            "store_writes": runtime_store.writes - store_writes_before,
+            "timer_wakeups": idle_wakeups,
+            "timer_wakeups_per_second": round(idle_wakeups / idle_seconds, 2),
+            "setup_seconds": round(setup_seconds, 3),
+            "memory_per_helper_kib": round(
+                (memory_after - memory_before) / size / 1024, 2
+            ),
+        }
+
+        await hass.async_stop(force=True)
+
+    return result
+
+
+# ------------------------------------------------------------------
+async def async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run all sizes."""
+
+    results: list[dict[str, Any]] = []
+
+    for size in args.sizes:
+        result = await async_run_size(size, args.events, args.fanout, args.idle)
+        print(result, file=sys.stderr)  # noqa: T201
+        results.append(result)
+
+    return results
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Entry point."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS)
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        default=1,
+        help="Number of helpers watching each source entity",
+    )
+    parser.add_argument("--idle", type=float, default=DEFAULT_IDLE_SECONDS)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args))
+    output: str = json.dumps({"results": results}, indent=2)
+
+    if args.output is None:
+        print(output)  # noqa: T201
+    else:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
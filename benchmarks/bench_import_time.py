@@ -0,0 +1,171 @@
+"""Cold start import time benchmark for State updated.
+
+Imports the modules Home Assistant loads when a State updated config entry is
+set up, the integration, the binary_sensor platform and the preloaded
+config_flow and diagnostics platforms, in a fresh interpreter per run, and
+reports, per mode:
+
+    import_ms_median/min    wall time of the imports
+    modules                 modules imported by the integration
+    heavy_modules           external and frontend modules which were imported
+
+Mode "lazy" is the integration as is. Mode "eager" also imports the
+hass_util package of the baseline revision, checked out from git into a
+temporary directory, which imported every submodule and its external
+imports, jsonpickle, aiofiles and packaging included, on a cold start.
+
+Requires Home Assistant, the external imports of the baseline hass_util and
+git, no network is used.
+
+    python benchmarks/bench_import_time.py --runs 20 --output out.json
+"""
+
+import argparse
+import io
+import json
+from pathlib import Path
+from statistics import median
+import subprocess
+import sys
+import tarfile
+from tempfile import TemporaryDirectory
+from typing import Any
+
+ROOT: Path = Path(__file__).parent.parent
+
+DEFAULT_RUNS = 10
+
+# Revision with the eager hass_util package
+DEFAULT_BASELINE = "15c8d0b"
+HASS_UTIL_PATH = "custom_components/state_updated/hass_util"
+
+SETUP_MODULES: tuple[str, ...] = (
+    "custom_components.state_updated",
+    "custom_components.state_updated.binary_sensor",
+    "custom_components.state_updated.config_flow",
+    "custom_components.state_updated.diagnostics",
+)
+
+HEAVY_MODULES: tuple[str, ...] = (
+    "aiofiles",
+    "jsonpickle",
+    "packaging.version",
+    "homeassistant.components.frontend",
+)
+
+# Runs in the child interpreter, Home Assistant itself is imported before the
+# clock starts, so only the imports of the integration are measured
+CHILD_SCRIPT = """
+import importlib, json, sys, time
+import homeassistant.core, homeassistant.helpers.entity_platform
+sys.path.insert(0, {root!r})
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+if {baseline!r}:
+    sys.path.insert(0, {baseline!r})
+    importlib.import_module("hass_util")
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(loaded),
+    "heavy_modules": sorted(name for name in {heavy!r} if name in loaded),
+}}))
+"""
+
+
+# ------------------------------------------------------------------
+def extract_baseline(revision: str, directory: Path) -> Path:
+    """Check out the hass_util package of revision, returns its parent."""
+
+    archive: bytes = subprocess.run(
+        ["git", "archive", "--format=tar", revision, HASS_UTIL_PATH],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+    ).stdout
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory, filter="data")
+
+    return (directory / HASS_UTIL_PATH).parent
+
+
+# ------------------------------------------------------------------
+def run_once(baseline: Path | None) -> dict[str, Any]:
+    """Import in a fresh interpreter, with the baseline hass_util if given."""
+
+    script: str = CHILD_SCRIPT.format(
+        root=str(ROOT),
+        modules=SETUP_MODULES,
+        baseline=str(baseline) if baseline is not None else "",
+        heavy=HEAVY_MODULES,
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+# ------------------------------------------------------------------
+def run_mode(baseline: Path | None, runs: int) -> dict[str, Any]:
+    """Run one mode, eager with the baseline hass_util."""
+
+    results: list[dict[str, Any]] = [run_once(baseline) for _ in range(runs)]
+    import_ms: list[float] = [result["seconds"] * 1000 for result in results]
+
+    return {
+        "mode": "lazy" if baseline is None else "eager",
+        "runs": runs,
+        "import_ms_median": round(median(import_ms), 2),
+        "import_ms_min": round(min(import_ms), 2),
+        "modules": results[-1]["modules"],
+        "heavy_modules": results[-1]["heavy_modules"],
+    }
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Entry point."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+
+    with TemporaryDirectory() as directory:
+        baseline: Path = extract_baseline(args.baseline, Path(directory))
+
+        for mode_baseline in (baseline, None):
+            result = run_mode(mode_baseline, args.runs)
+            print(result, file=sys.stderr)  # noqa: T201
+            results.append(result)
+
+    output: str = json.dumps(
+        {
+            "baseline": args.baseline,
+            "results": results,
+            "saved_ms": round(
+                results[0]["import_ms_median"] - results[1]["import_ms_median"], 2
+            ),
+        },
+        indent=2,
+    )
+
+    if args.output is None:
+        print(output)  # noqa: T201
+    else:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""StorageJson serializer benchmark.
+
+Encodes and decodes a store object holding 100, 1,000 and 10,000 records,
+with the jsonpickle encoder StorageJson used before, including its
+__getstate__ walk stripping hidden attributes, and with the field plan
+serializer and orjson it uses now, and reports, per size and encoder:
+
+    encode_ms_median        object to json bytes
+    decode_ms_median        json bytes to object
+    bytes                   size of the json
+    peak_kib                traced peak memory of one encode
+
+Requires Home Assistant and jsonpickle, no network is used.
+
+    python benchmarks/bench_storage_json.py --sizes 100 1000 --output out.json
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+import json
+from pathlib import Path
+from statistics import median
+import sys
+from time import perf_counter
+import tracemalloc
+from typing import Any
+
+import jsonpickle
+import orjson
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.state_updated.hass_util.field_plan import (  # noqa: E402
+    encode_value,
+    get_field_plan,
+)
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_RUNS = 10
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class Kind(StrEnum):
+    """Record kind."""
+
+    SENSOR = "sensor"
+    SWITCH = "switch"
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+@dataclass
+class Record:
+    """Stored record."""
+
+    entity_id: str
+    kind: Kind
+    value: float
+    last_updated: datetime
+    tags: list[str] = field(default_factory=list)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class Settings:
+    """Store object, like a StorageJson subclass."""
+
+    storage_fields___ = ("version", "records")
+
+    version: int
+    records: dict[str, Record]
+
+    def __init__(self, size: int) -> None:
+        """Init."""
+        now: datetime = datetime.now(UTC)
+
+        self.cache___: dict[str, Any] = {"hidden": True}
+        self.version = 1
+        self.records = {
+            f"sensor.record_{index}": Record(
+                f"sensor.record_{index}",
+                Kind.SENSOR if index % 2 else Kind.SWITCH,
+                index / 3,
+                now - timedelta(seconds=index),
+                ["a", "b"],
+            )
+            for index in range(size)
+        }
+
+    # ------------------------------------------------------------------
+    def __getstate__(self) -> dict:
+        """Get state, the hidden attribute walk of the jsonpickle encoder."""
+        tmp_dict = self.__dict__.copy()
+
+        def remove_hidden_attrib(obj) -> None:
+            for key in list(obj):
+                if len(key) > 2 and key[0:2] == "__":
+                    continue
+                elif hasattr(obj[key], "__dict__"):  # noqa: RET507
+                    remove_hidden_attrib(obj[key].__dict__)
+                elif len(key) > 3 and key[-3:] == "___":
+                    del obj[key]
+                elif isinstance(obj[key], list):
+                    for item in obj[key]:
+                        if hasattr(item, "__dict__"):
+                            remove_hidden_attrib(item.__dict__)
+
+        remove_hidden_attrib(tmp_dict)
+        return tmp_dict
+
+
+# ------------------------------------------------------------------
+def encode_jsonpickle(settings: Settings) -> bytes:
+    """Encode like StorageJson did."""
+
+    jsonpickle.set_encoder_options("json", ensure_ascii=False)
+    return json.dumps(
+        {"jsonpickle": jsonpickle.encode(settings, unpicklable=True)},
+        ensure_ascii=False,
+    ).encode()
+
+
+# ------------------------------------------------------------------
+def decode_jsonpickle(data: bytes) -> Settings:
+    """Decode like StorageJson did."""
+    return jsonpickle.decode(json.loads(data)["jsonpickle"])
+
+
+# ------------------------------------------------------------------
+def encode_field_plan(settings: Settings) -> bytes:
+    """Encode like StorageJson does."""
+    return orjson.dumps({"fields": get_field_plan(Settings).encode(settings)})
+
+
+# ------------------------------------------------------------------
+def decode_field_plan(data: bytes) -> Settings:
+    """Decode like StorageJson does."""
+
+    settings: Settings = Settings.__new__(Settings)
+    get_field_plan(Settings).decode_into(settings, orjson.loads(data)["fields"])
+    return settings
+
+
+ENCODERS: dict[str, tuple[Any, Any]] = {
+    "jsonpickle": (encode_jsonpickle, decode_jsonpickle),
+    "field_plan": (encode_field_plan, decode_field_plan),
+}
+
+
+# ------------------------------------------------------------------
+def run_encoder(name: str, size: int, runs: int) -> dict[str, Any]:
+    """Run one encoder at one size."""
+
+    encode, decode = ENCODERS[name]
+    settings: Settings = Settings(size)
+    encode_ms: list[float] = []
+    decode_ms: list[float] = []
+
+    for _ in range(runs):
+        start: float = perf_counter()
+        data: bytes = encode(settings)
+        encode_ms.append((perf_counter() - start) * 1000)
+
+        start = perf_counter()
+        decoded: Settings = decode(data)
+        decode_ms.append((perf_counter() - start) * 1000)
+
+    assert encode_value(decoded.records) == encode_value(settings.records)
+
+    tracemalloc.start()
+    encode(settings)
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "encoder": name,
+        "size": size,
+        "encode_ms_median": round(median(encode_ms), 3),
+        "decode_ms_median": round(median(decode_ms), 3),
+        "bytes": len(data),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+# ------------------------------------------------------------------
+def main() -> None:
+    """Entry point."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+
+    for size in args.sizes:
+        for name in ENCODERS:
+            result = run_encoder(name, size, args.runs)
+            print(result, file=sys.stderr)  # noqa: T201
+            results.append(result)
+
+    output: str = json.dumps({"results": results}, indent=2)
+
+    if args.output is None:
+        print(output)  # noqa: T201
+    else:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
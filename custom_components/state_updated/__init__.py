@@ -3,21 +3,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import timedelta
+from time import perf_counter
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_ID, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, start
 from homeassistant.helpers.device import (
     async_remove_stale_devices_links_keep_current_device,
 )
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.typing import ConfigType
 
 from .component_api import ComponentApi
-from .const import DOMAIN, LOGGER
+from .const import CONF_TEXT_TEMPLATE, DOMAIN
+from .issues import async_get_issues
+from .metrics import async_get_metrics
+from .runtime_store import async_get_runtime_store
+from .services import async_setup_services
+from .template_cache import async_get_template_cache
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
@@ -25,7 +33,6 @@ PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR]
 class CommonData:
     """Common data."""
 
-    coordinator: DataUpdateCoordinator
     component_api: ComponentApi
 
 
@@ -33,28 +40,47 @@ class CommonData:
 type CommonConfigEntry = ConfigEntry[CommonData]
 
 
+# ------------------------------------------------------------------
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the State updated integration."""
+
+    async_setup_services(hass)
+
+    # Runtime state of all entries is loaded in one read, before any entry
+    await async_get_runtime_store(hass).async_load()
+
+    @callback
+    def preload_translations(hass: HomeAssistant) -> None:
+        """Load the translations used by the flows after startup."""
+
+        from .hass_util import Translate  # noqa: PLC0415
+
+        hass.async_create_background_task(
+            Translate.async_preload(hass), f"{DOMAIN} preload translations"
+        )
+
+    start.async_at_started(hass, preload_translations)
+    return True
+
+
 # ------------------------------------------------------------------
 async def async_setup_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> bool:
     """Set up State updates from a config entry."""
 
+    start_time: float = perf_counter()
+    await async_get_runtime_store(hass).async_load()
+
     component_api: ComponentApi = ComponentApi(
         hass,
         entry,
     )
 
-    coordinator: DataUpdateCoordinator = DataUpdateCoordinator(
-        hass,
-        LOGGER,
-        name=DOMAIN,
-        update_interval=timedelta(seconds=30),
-        update_method=component_api.async_update,
-    )
-
     entry.runtime_data = CommonData(
         component_api=component_api,
-        coordinator=coordinator,
     )
 
+    entry.async_on_unload(component_api.async_unload)
+
     entry.async_on_unload(entry.add_update_listener(config_update_listener))
 
     async_remove_stale_devices_links_keep_current_device(
@@ -65,6 +91,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> bo
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    async_get_metrics(hass).async_observe_setup(
+        entry.entry_id, perf_counter() - start_time
+    )
     return True
 
 
@@ -74,6 +103,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> b
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+# ------------------------------------------------------------------
+async def async_remove_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> None:
+    """Remove runtime state and issues when a config entry is removed."""
+
+    async_get_issues(hass).async_remove_helper(entry.entry_id)
+
+    runtime_store = async_get_runtime_store(hass)
+    await runtime_store.async_load()
+    runtime_store.async_remove(entry.entry_id)
+
+
 # ------------------------------------------------------------------
 async def async_reload_entry(hass: HomeAssistant, entry: CommonConfigEntry) -> None:
     """Reload config entry."""
@@ -88,8 +128,9 @@ async def config_update_listener(
 ) -> None:
     """Reload on config entry update."""
 
-    if config_entry.runtime_data.component_api.supress_update_listener:
-        config_entry.runtime_data.component_api.supress_update_listener = False
-        return
+    if (
+        text_template := config_entry.runtime_data.component_api.text_template
+    ) != config_entry.options.get(CONF_TEXT_TEMPLATE):
+        async_get_template_cache(hass).async_invalidate(text_template)
 
     await hass.config_entries.async_reload(config_entry.entry_id)
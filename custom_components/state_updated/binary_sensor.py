@@ -3,46 +3,82 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import cache
+from time import perf_counter
+from typing import Any
+
+import orjson
+import voluptuous as vol
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    ATTR_ICON,
     CONF_ATTRIBUTE,
     CONF_DEVICE_ID,
-    CONF_ENTITY_ID,
     CONF_ICON,
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
 )
-from homeassistant.core import Event, HomeAssistant, ServiceCall, State, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    State,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import (
+    config_validation as cv,
     entity_platform,
-    entity_registry as er,
-    icon as ic,
-    issue_registry as ir,
-    start,
 )
 from homeassistant.helpers.device import async_device_info_to_link_from_device_id
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import (
-    EventStateChangedData,
-    async_track_state_change_event,
-)
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 from . import CommonConfigEntry
 from .component_api import ComponentApi
 from .const import (
+    ATTR_END,
+    ATTR_LIMIT,
+    ATTR_START,
+    ATTR_TEXT,
+    CONF_ATTRIBUTE_MAX_SIZE,
     CONF_LAST_UPDATED,
     CONF_NEW_VALUE,
     CONF_OLD_VALUE,
-    DOMAIN,
-    DOMAIN_NAME,
+    CONF_UNRECORDED_ATTRIBUTES,
     LOGGER,
+    SERVICE_GET_HISTORY,
+    SERVICE_RESET_ENTITY,
     TRANSLATION_KEY,
-    TRANSLATION_KEY_MISSING_ENTITY,
 )
+from .source_table import ATTR_CHANGED_SOURCES, ATTR_SOURCE_ENTITY_ID
+from .source_verifier import async_get_source_verifier
+from .structural_diff import ATTR_CHANGED_KEYS, ATTR_CHANGES
+
+
+# ------------------------------------------------------
+def cap_attribute_value(value: Any, max_size: int) -> Any:
+    """Truncate strings, and lists and dicts as json, longer than max_size."""
+
+    if isinstance(value, str):
+        if len(value) <= max_size:
+            return value
+
+        return value[:max_size] + "…"
+
+    if not isinstance(value, dict | list | tuple):
+        return value
+
+    try:
+        json_value: str = orjson.dumps(value, default=str).decode()
+    except TypeError:
+        json_value = repr(value)
+
+    if len(json_value) <= max_size:
+        return value
+
+    return json_value[:max_size] + "…"
 
 
 # ------------------------------------------------------
@@ -53,7 +89,35 @@ async def async_setup_entry(
 ) -> None:
     """Entry for State updated setup."""
 
-    async_add_entities([StateUpdatedBinarySensor(hass, entry)])
+    async_add_entities(
+        [
+            binary_sensor_class(
+                frozenset(entry.options.get(CONF_UNRECORDED_ATTRIBUTES, ()))
+            )(hass, entry)
+        ]
+    )
+
+
+# ------------------------------------------------------
+@cache
+def binary_sensor_class(
+    unrecorded_attributes: frozenset[str],
+) -> type[StateUpdatedBinarySensor]:
+    """Binary sensor class not recording the configured attributes.
+
+    Unrecorded attributes are declared per class, so a subclass is made once
+    per set of configured attributes.
+    """
+
+    if not unrecorded_attributes:
+        return StateUpdatedBinarySensor
+
+    base: type[StateUpdatedBinarySensor] = StateUpdatedBinarySensor
+    unrecorded_attributes |= base._unrecorded_attributes  # noqa: SLF001
+
+    return type(
+        base.__name__, (base,), {"_unrecorded_attributes": unrecorded_attributes}
+    )
 
 
 # ------------------------------------------------------
@@ -61,8 +125,6 @@ async def async_setup_entry(
 class StateUpdatedBinarySensor(BinarySensorEntity):
     """Sensor class for State updated."""
 
-    entity_list: list[ComponentApi] = []
-
     # ------------------------------------------------------
     def __init__(
         self,
@@ -78,22 +140,31 @@ class StateUpdatedBinarySensor(BinarySensorEntity):
 
         self.component_api: ComponentApi = entry.runtime_data.component_api
 
-        self.coordinator: DataUpdateCoordinator = entry.runtime_data.coordinator
-        self.component_api.coordinator = self.coordinator
-
         platform = entity_platform.async_get_current_platform()
         platform.async_register_entity_service(
-            "reset_entity",
+            SERVICE_RESET_ENTITY,
             None,
             self.async_reset_entity,
         )
-
-        self.hass.services.async_register(
-            DOMAIN, "reset_all", self.async_reset_all_service
+        platform.async_register_entity_service(
+            SERVICE_GET_HISTORY,
+            {
+                vol.Optional(ATTR_START): cv.datetime,
+                vol.Optional(ATTR_END): cv.datetime,
+                vol.Optional(ATTR_LIMIT): cv.positive_int,
+            },
+            self.async_get_history,
+            supports_response=SupportsResponse.ONLY,
         )
 
         self.entity_icon: str = None
 
+        self.attribute_max_size: int = int(
+            entry.options.get(CONF_ATTRIBUTE_MAX_SIZE) or 0
+        )
+        self._attributes: dict[str, Any] | None = None
+        self._attributes_revision: int = -1
+
         self._attr_device_info = async_device_info_to_link_from_device_id(
             hass,
             entry.options.get(CONF_DEVICE_ID),
@@ -106,124 +177,109 @@ class StateUpdatedBinarySensor(BinarySensorEntity):
         """Reset entity."""
         await entity.component_api.async_reset()
 
-    # ------------------------------------------------------------------
-    async def async_reset_all_service(self, call: ServiceCall) -> None:
-        """Reset all service."""
+    # ------------------------------------------------------
+    async def async_get_history(
+        self, entity: StateUpdatedBinarySensor, call: ServiceCall
+    ) -> ServiceResponse:
+        """Get change history."""
+
+        start: datetime | None = call.data.get(ATTR_START)
+        end: datetime | None = call.data.get(ATTR_END)
 
-        for entity in StateUpdatedBinarySensor.entity_list:
-            await entity.async_reset()
+        return {
+            "history": entity.component_api.history.query(
+                start=dt_util.as_utc(start) if start is not None else None,
+                end=dt_util.as_utc(end) if end is not None else None,
+                limit=call.data.get(ATTR_LIMIT),
+            )
+        }
 
     # ------------------------------------------------------
-    async def async_will_remove_from_hass(self) -> None:
-        """When removed from hass."""
-        StateUpdatedBinarySensor.entity_list.remove(self.component_api)
+    @callback
+    def sensor_state_listener(
+        self,
+        entity_id: str,
+        new_state: State | None,
+        old_state: State | None,
+    ) -> None:
+        """Handle state changes on the observed device."""
+        if new_state is None:
+            return
+
+        if metrics_enabled := self.component_api.metrics_registry.enabled:
+            start: float = perf_counter()
+            self.component_api.metrics.increment("events")
+
+        try:
+            if CONF_ATTRIBUTE in self.entry.options:
+                new_value = new_state.attributes.get(self.entry.options[CONF_ATTRIBUTE])
+            else:
+                new_value = new_state.state
+
+            if new_value not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+                old_value = STATE_UNKNOWN
+
+                if old_state is not None:
+                    if CONF_ATTRIBUTE in self.entry.options:
+                        old_value = old_state.attributes.get(
+                            self.entry.options[CONF_ATTRIBUTE]
+                        )
+                    else:
+                        old_value = old_state.state
+
+                if self.component_api.update_state(new_value, old_value, entity_id):
+                    self.async_write_ha_state()
+
+                    if metrics_enabled:
+                        self.component_api.metrics.observe(
+                            "event_to_write", perf_counter() - start
+                        )
+            elif metrics_enabled:
+                self.component_api.metrics.increment("unchanged")
+        except (ValueError, TypeError) as ex:
+            if metrics_enabled:
+                self.component_api.metrics.increment("unchanged")
+            LOGGER.error(ex)
 
     # ------------------------------------------------------
     async def async_added_to_hass(self) -> None:
         """Complete device setup after being added to hass."""
 
-        # ------------------------------------------------------
-        @callback
-        def sensor_state_listener(
-            event: Event[EventStateChangedData],
-        ) -> None:
-            """Handle state changes on the observed device."""
-            if (tmp_state := event.data["new_state"]) is None:
-                return
-            try:
-                if CONF_ATTRIBUTE in self.entry.options:
-                    new_value = tmp_state.attributes.get(
-                        self.entry.options[CONF_ATTRIBUTE]
-                    )
-                else:
-                    new_value = tmp_state.state
-
-                if new_value not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
-                    old_value = STATE_UNKNOWN
-
-                    if (tmp_state := event.data["old_state"]) is not None:
-                        if CONF_ATTRIBUTE in self.entry.options:
-                            old_value = tmp_state.attributes.get(
-                                self.entry.options[CONF_ATTRIBUTE]
-                            )
-                        else:
-                            old_value = tmp_state.state
-
-                    self.component_api.update_state(new_value, old_value)
-                    self.async_schedule_update_ha_state(True)
-            except (ValueError, TypeError) as ex:
-                LOGGER.error(ex)
-
         await super().async_added_to_hass()
 
-        await self.coordinator.async_config_entry_first_refresh()
-
-        StateUpdatedBinarySensor.entity_list.append(self.component_api)
+        self.component_api.entity_id = self.entity_id
 
         self.entry.async_on_unload(self.entry.add_update_listener(self.update_listener))
 
         self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.entry.options[CONF_ENTITY_ID],
-                sensor_state_listener,
-            )
+            self.component_api.async_track_sources(self.sensor_state_listener)
         )
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.component_api.async_add_listener(self.async_write_ha_state)
         )
 
-        self.async_on_remove(start.async_at_started(self.hass, self.hass_started))
-
-    # ------------------------------------------------------
-    async def async_verify_entity_exist(
-        self,
-    ) -> bool:
-        """Verify entity exist."""
-
-        state: State | None = self.hass.states.get(
-            self.entry.options.get(CONF_ENTITY_ID)
-        )
-
-        if state is None:
-            await self.async_create_issue_entity(
-                self.entry.options.get(CONF_ENTITY_ID),
-                TRANSLATION_KEY_MISSING_ENTITY,
+        self.async_on_remove(
+            async_get_source_verifier(self.hass).async_add(
+                self.component_api, self.async_sources_verified
             )
-            self.coordinator.update_interval = None
-            return False
-
-        return True
+        )
 
     # ------------------------------------------------------
-    async def hass_started(self, _event: Event) -> None:
-        """Hass started."""
+    async def async_sources_verified(self, missing: list[str]) -> None:
+        """Sources verified by the startup pass."""
+
+        self.component_api.issues.async_sources_verified(
+            self.entry.entry_id,
+            self.entity_id,
+            self.component_api.source_entity_ids,
+            missing,
+        )
 
-        if await self.async_verify_entity_exist():
-            self.entity_icon = await self.async_get_icon(
-                self.entry.options.get(CONF_ENTITY_ID)
+        if not missing and self.component_api.sources is None:
+            self.entity_icon = await self.component_api.source_metadata.async_get_icon(
+                self.component_api.source_entity_id
             )
 
-    # ------------------------------------------------------------------
-    async def async_create_issue_entity(
-        self, entity_id: str, translation_key: str
-    ) -> None:
-        """Create issue on entity."""
-
-        ir.async_create_issue(
-            self.hass,
-            DOMAIN,
-            DOMAIN_NAME + datetime.now().isoformat(),
-            issue_domain=DOMAIN,
-            is_fixable=False,
-            severity=ir.IssueSeverity.WARNING,
-            translation_key=translation_key,
-            translation_placeholders={
-                "entity": entity_id,
-                "state_updated_helper": self.entity_id,
-            },
-        )
-
     # ------------------------------------------------------
     async def update_listener(
         self,
@@ -284,73 +340,55 @@ class StateUpdatedBinarySensor(BinarySensorEntity):
     def extra_state_attributes(self) -> dict:
         """Extra state attributes.
 
+        The dict is built once per change of the component api and reused for
+        every state write until the next change.
+
         Returns:
             dict: _description_
 
         """
 
-        return {
-            CONF_NEW_VALUE: self.component_api.new_value,
-            CONF_OLD_VALUE: self.component_api.old_value,
-            CONF_LAST_UPDATED: self.component_api.last_updated.isoformat(),
-            "text": self.component_api.text,
-        }
+        if self._attributes_revision != self.component_api.revision:
+            self._attributes = self.build_state_attributes()
+            self._attributes_revision = self.component_api.revision
 
-    # ------------------------------------------------------
-    @property
-    def should_poll(self) -> bool:
-        """No need to poll. Coordinator notifies entity of updates."""
-        return False
+        return self._attributes
 
     # ------------------------------------------------------
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
+    def build_state_attributes(self) -> dict[str, Any]:
+        """Build state attributes, values capped to attribute max size."""
+
+        attributes: dict[str, Any]
+
+        if self.component_api.sources is not None:
+            attributes = {
+                ATTR_CHANGED_SOURCES: self.component_api.sources.changed_sources(),
+                ATTR_SOURCE_ENTITY_ID: self.component_api.source_entity_id,
+                CONF_NEW_VALUE: self.component_api.new_value,
+                CONF_OLD_VALUE: self.component_api.old_value,
+            }
+        elif self.component_api.structural_diff:
+            attributes = {
+                ATTR_CHANGED_KEYS: self.component_api.change_filter.changed_keys,
+                ATTR_CHANGES: self.component_api.change_filter.changes,
+            }
+        else:
+            attributes = {
+                CONF_NEW_VALUE: self.component_api.new_value,
+                CONF_OLD_VALUE: self.component_api.old_value,
+            }
+
+        attributes[CONF_LAST_UPDATED] = self.component_api.last_updated.isoformat()
+        attributes[ATTR_TEXT] = self.component_api.text
+
+        if self.attribute_max_size > 0:
+            for key, value in attributes.items():
+                attributes[key] = cap_attribute_value(value, self.attribute_max_size)
+
+        return attributes
 
     # ------------------------------------------------------
-    async def async_update(self) -> None:
-        """Update the entity. Only used by the generic entity update service."""
-        await self.coordinator.async_request_refresh()
-
-    # ------------------------------------------------------
-    async def async_get_icon(self, entity_id: str) -> str:
-        """Get icon."""
-
-        state: State | None = self.hass.states.get(entity_id)
-        tmp_icon = state.attributes.get(ATTR_ICON, None)
-
-        if tmp_icon is not None:
-            return tmp_icon
-
-        entity_registry = er.async_get(self.hass)
-        source_entity = entity_registry.async_get(entity_id)
-
-        if source_entity is not None:
-            if source_entity.icon is not None:
-                return source_entity.icon
-
-            icons = await ic.async_get_icons(
-                self.hass,
-                "entity",
-                integrations=[source_entity.platform],
-                # "entity_component",
-                # integrations=["sensor"],
-            )
-
-            if (
-                icons is not None
-                and source_entity.platform in icons
-                and source_entity.domain in icons[source_entity.platform]
-                and source_entity.translation_key
-                in icons[source_entity.platform][source_entity.domain]
-                and "default"
-                in icons[source_entity.platform][source_entity.domain][
-                    source_entity.translation_key
-                ]
-            ):
-                return icons[source_entity.platform][source_entity.domain][
-                    source_entity.translation_key
-                ]["default"]
-
-        return None
+    @property
+    def should_poll(self) -> bool:
+        """No need to poll. Component api notifies entity of updates."""
+        return False
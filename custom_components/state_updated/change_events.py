@@ -0,0 +1,88 @@
+"""Change events.
+
+State updated helpers can fire an event on the bus for every detected
+change, or hand the change to a shared batcher which fires one event per
+event loop iteration with the changes of all helpers.
+"""
+
+from enum import StrEnum
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, EVENT_CHANGED_BATCH
+
+DATA_CHANGE_EVENT_BATCHER: HassKey["ChangeEventBatcher"] = HassKey(
+    f"{DOMAIN}_change_event_batcher"
+)
+
+ATTR_CHANGES = "changes"
+ATTR_SOURCE = "source"
+ATTR_TIMESTAMP = "timestamp"
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class EventMode(StrEnum):
+    """Change event mode."""
+
+    OFF = "off"
+    CHANGE = "change"
+    BATCH = "batch"
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_CHANGE_EVENT_BATCHER)
+def async_get_change_event_batcher(hass: HomeAssistant) -> "ChangeEventBatcher":
+    """Get the change event batcher shared by all entries."""
+    return ChangeEventBatcher(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class ChangeEventBatcher:
+    """Change event batcher.
+
+    The first change in a loop iteration schedules the flush with
+    call_soon, later changes in the same iteration are only appended.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._pending: list[dict[str, Any]] = []
+        self._scheduled: bool = False
+
+        self.events: int = 0
+        self.changes: int = 0
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_add(self, change: dict[str, Any]) -> None:
+        """Add change to the next batch event."""
+
+        self._pending.append(change)
+
+        if not self._scheduled:
+            self._scheduled = True
+            self.hass.loop.call_soon(self._async_fire)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_fire(self) -> None:
+        """Fire one event with the pending changes."""
+
+        pending: list[dict[str, Any]] = self._pending
+        self._pending = []
+        self._scheduled = False
+
+        if not pending:
+            return
+
+        self.events += 1
+        self.changes += len(pending)
+        self.hass.bus.async_fire(EVENT_CHANGED_BATCH, {ATTR_CHANGES: pending})
@@ -0,0 +1,125 @@
+"""Change filter.
+
+Decides if a new value is a change. Numeric values can be filtered with an
+absolute or percentage deadband, or with hysteresis relative to the last
+reported value. Non numeric values fall back to plain inequality.
+"""
+
+from enum import StrEnum
+from math import isfinite
+from typing import Any
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class NumericMode(StrEnum):
+    """Numeric change mode."""
+
+    OFF = "off"
+    ABSOLUTE = "absolute"
+    PERCENTAGE = "percentage"
+    HYSTERESIS = "hysteresis"
+
+
+# ------------------------------------------------------------------
+def parse_number(value: Any) -> float | None:
+    """Parse value as a finite number, None if it is not numeric."""
+
+    if isinstance(value, bool):
+        return None
+
+    if isinstance(value, int | float):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+    else:
+        return None
+
+    return number if isfinite(number) else None
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class ChangeFilter:
+    """Change filter.
+
+    The parsed number of the last raw value and of the last reported value
+    are cached, so each event parses at most its new value. The old value of
+    an event is normally the new value of the previous one.
+    """
+
+    __slots__ = (
+        "_raw_number",
+        "_raw_value",
+        "_reported_number",
+        "_reported_value",
+        "mode",
+        "threshold",
+    )
+
+    def __init__(
+        self,
+        mode: NumericMode = NumericMode.OFF,
+        threshold: float = 0.0,
+        reported_value: Any = None,
+    ) -> None:
+        """Init."""
+        self.mode: NumericMode = mode
+        self.threshold: float = abs(threshold)
+
+        self._raw_value: Any = None
+        self._raw_number: float | None = None
+        self._reported_value: Any = None
+        self._reported_number: float | None = None
+        self.reported(reported_value)
+
+    # ------------------------------------------------------------------
+    def _number(self, value: Any) -> float | None:
+        """Parsed number of value, using the cached values when possible."""
+
+        if value is self._raw_value or value == self._raw_value:
+            return self._raw_number
+
+        if value is self._reported_value or value == self._reported_value:
+            return self._reported_number
+
+        return parse_number(value)
+
+    # ------------------------------------------------------------------
+    def is_change(self, new_value: Any, old_value: Any) -> bool:
+        """Return True if new value is a change compared to old value."""
+
+        if self.mode is NumericMode.OFF:
+            return new_value != old_value
+
+        reference: float | None = (
+            self._reported_number
+            if self.mode is NumericMode.HYSTERESIS
+            else self._number(old_value)
+        )
+
+        new_number: float | None = self._number(new_value)
+        self._raw_value = new_value
+        self._raw_number = new_number
+
+        if new_number is None or reference is None:
+            return new_value != old_value
+
+        delta: float = abs(new_number - reference)
+
+        if self.mode is NumericMode.PERCENTAGE:
+            if reference == 0:
+                return delta > 0
+            return delta / abs(reference) * 100 > self.threshold
+
+        return delta > self.threshold
+
+    # ------------------------------------------------------------------
+    def reported(self, value: Any) -> None:
+        """Remember the last reported value."""
+
+        self._reported_number = self._number(value)
+        self._reported_value = value
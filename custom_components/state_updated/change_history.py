@@ -0,0 +1,144 @@
+"""Change history.
+
+Fixed capacity ring buffer of the last transitions of a State updated helper.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import UTC, datetime
+from typing import Any
+
+from homeassistant.const import CONF_ENTITY_ID
+
+from .const import CONF_NEW_VALUE, CONF_OLD_VALUE
+
+ATTR_TIMESTAMP = "timestamp"
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class ChangeHistory:
+    """Change history ring buffer.
+
+    Transitions are kept in parallel preallocated arrays, so recording a
+    change only overwrites three slots. Timestamps are stored as POSIX
+    seconds and are ascending in logical order, which lets queries bisect.
+    """
+
+    __slots__ = (
+        "_head",
+        "_new_values",
+        "_old_values",
+        "_size",
+        "_sources",
+        "_timestamps",
+        "capacity",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        """Init."""
+        self.capacity: int = max(capacity, 0)
+
+        self._timestamps: array = array("d", bytes(8 * self.capacity))
+        self._old_values: list[Any] = [None] * self.capacity
+        self._new_values: list[Any] = [None] * self.capacity
+        self._sources: list[str | None] = [None] * self.capacity
+        self._head: int = 0
+        self._size: int = 0
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of recorded transitions."""
+        return self._size
+
+    # ------------------------------------------------------------------
+    def append(
+        self,
+        timestamp: datetime,
+        old_value: Any,
+        new_value: Any,
+        source: str | None = None,
+    ) -> None:
+        """Record a transition, overwriting the oldest when full.
+
+        Source is the entity id of the transition for helpers watching more
+        than one entity.
+        """
+
+        if self.capacity == 0:
+            return
+
+        index: int = self._head
+        self._timestamps[index] = timestamp.timestamp()
+        self._old_values[index] = old_value
+        self._new_values[index] = new_value
+        self._sources[index] = source
+
+        self._head = (index + 1) % self.capacity
+
+        if self._size < self.capacity:
+            self._size += 1
+
+    # ------------------------------------------------------------------
+    def clear(self) -> None:
+        """Remove all transitions."""
+
+        self._head = self._size = 0
+
+        for index in range(self.capacity):
+            self._old_values[index] = self._new_values[index] = None
+            self._sources[index] = None
+
+    # ------------------------------------------------------------------
+    def _index(self, position: int) -> int:
+        """Physical index of logical position, 0 is the oldest transition."""
+        return (self._head - self._size + position) % self.capacity
+
+    # ------------------------------------------------------------------
+    def _timestamp_at(self, position: int) -> float:
+        """Timestamp at logical position."""
+        return self._timestamps[self._index(position)]
+
+    # ------------------------------------------------------------------
+    def query(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Transitions between start and end, both included, oldest first.
+
+        With limit only the most recent transitions are returned.
+        """
+
+        positions = range(self._size)
+        low: int = 0
+        high: int = self._size
+
+        if start is not None:
+            low = bisect_left(positions, start.timestamp(), key=self._timestamp_at)
+
+        if end is not None:
+            high = bisect_right(positions, end.timestamp(), key=self._timestamp_at)
+
+        if limit is not None:
+            low = max(low, high - limit)
+
+        result: list[dict[str, Any]] = []
+
+        for position in range(low, high):
+            index: int = self._index(position)
+            transition: dict[str, Any] = {
+                ATTR_TIMESTAMP: datetime.fromtimestamp(
+                    self._timestamps[index], UTC
+                ).isoformat(),
+                CONF_OLD_VALUE: self._old_values[index],
+                CONF_NEW_VALUE: self._new_values[index],
+            }
+
+            if self._sources[index] is not None:
+                transition[CONF_ENTITY_ID] = self._sources[index]
+
+            result.append(transition)
+
+        return result
@@ -1,6 +1,7 @@
 """Component api."""
 
 from datetime import UTC, datetime, timedelta
+from time import perf_counter
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -10,23 +11,65 @@ from homeassistant.const import (
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import HomeAssistantError, TemplateError
-from homeassistant.helpers import issue_registry as ir
-from homeassistant.helpers.entity import get_unit_of_measurement
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, State, callback
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.template import Template
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 from .const import (
     CONF_CLEAR_UPDATES_AFTER_MINUTES,
+    CONF_DEBOUNCE_SECONDS,
+    CONF_EVENT_MODE,
+    CONF_HISTORY_SIZE,
     CONF_LAST_UPDATED,
     CONF_NEW_VALUE,
+    CONF_NUMERIC_MODE,
+    CONF_NUMERIC_THRESHOLD,
     CONF_OLD_VALUE,
+    CONF_STRUCTURAL_DIFF,
     CONF_TEXT_TEMPLATE,
     CONF_UPDATED,
-    DOMAIN,
-    DOMAIN_NAME,
-    TRANSLATION_KEY_MISSING_ENTITY,
+    DEFAULT_HISTORY_SIZE,
+    EVENT_CHANGED,
+)
+from .change_events import (
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    ChangeEventBatcher,
+    EventMode,
+    async_get_change_event_batcher,
+)
+from .change_filter import ChangeFilter, NumericMode
+from .change_history import ChangeHistory
+from .expiry_scheduler import ExpiryScheduler, async_get_expiry_scheduler
+from .issues import IssueManager, async_get_issues
+from .metrics import HelperMetrics, MetricsRegistry, async_get_metrics
+from .runtime_store import RuntimeRecord, RuntimeStore, async_get_runtime_store
+from .source_index import SourceIndex, SourceMatcher, async_get_source_index
+from .source_metadata import SourceMetadataCache, async_get_source_metadata
+from .source_table import ATTR_CHANGED_SOURCES, ATTR_SOURCES, SourceTable
+from .structural_diff import (
+    ATTR_CHANGED_KEYS,
+    ATTR_CHANGES,
+    ATTR_VALUE_HASH,
+    LazyText,
+    StructuralDiff,
+    stable_hash,
+)
+from .state_dispatcher import (
+    StateChangeDispatcher,
+    StateChangeSubscriber,
+    async_get_state_dispatcher,
+)
+from .template_cache import TemplateCache, async_get_template_cache
+
+RUNTIME_STATE_KEYS: tuple[str, ...] = (
+    CONF_NEW_VALUE,
+    CONF_OLD_VALUE,
+    CONF_UPDATED,
+    CONF_LAST_UPDATED,
 )
 
 
@@ -44,165 +87,590 @@ class ComponentApi:
         """Component api."""
         self.hass = hass
         self.entry: ConfigEntry = entry
-        self.coordinator: DataUpdateCoordinator
+        self.entity_id: str | None = None
+        self.state_dispatcher: StateChangeDispatcher = async_get_state_dispatcher(hass)
+        self.source_index: SourceIndex = async_get_source_index(hass)
+        self.source_metadata: SourceMetadataCache = async_get_source_metadata(hass)
+        self.source_matcher: SourceMatcher | None = SourceMatcher.from_options(
+            entry.options
+        )
+        self.source_entity_ids: list[str] = (
+            cv.ensure_list(entry.options.get(CONF_ENTITY_ID))
+            if self.source_matcher is None
+            else self.source_index.async_match(self.source_matcher)
+        )
+        self.source_entity_id: str = (
+            self.source_entity_ids[0] if self.source_entity_ids else ""
+        )
+        self.expiry_scheduler: ExpiryScheduler = async_get_expiry_scheduler(hass)
+        self.runtime_store: RuntimeStore = async_get_runtime_store(hass)
+        self.template_cache: TemplateCache = async_get_template_cache(hass)
+        self.metrics_registry: MetricsRegistry = async_get_metrics(hass)
+        self.issues: IssueManager = async_get_issues(hass)
+        self.metrics: HelperMetrics = self.metrics_registry.async_get_helper(
+            entry.entry_id
+        )
+        self.text_template: str = str(entry.options.get(CONF_TEXT_TEMPLATE) or "")
+        self.debounce_seconds: float = float(
+            entry.options.get(CONF_DEBOUNCE_SECONDS) or 0
+        )
+
+        self.event_mode: EventMode = EventMode(
+            entry.options.get(CONF_EVENT_MODE, EventMode.OFF)
+        )
+        self.change_event_batcher: ChangeEventBatcher | None = (
+            async_get_change_event_batcher(hass)
+            if self.event_mode is EventMode.BATCH
+            else None
+        )
+
+        self.history: ChangeHistory = ChangeHistory(
+            int(entry.options.get(CONF_HISTORY_SIZE, DEFAULT_HISTORY_SIZE))
+        )
 
-        self.updated: bool = entry.options.get(CONF_UPDATED, False)
-        self.last_updated: datetime = datetime.fromisoformat(
-            entry.options.get(CONF_LAST_UPDATED, datetime.now(UTC).isoformat)
+        self._debounce_unsub: CALLBACK_TYPE | None = None
+        self._debounce_last: datetime = datetime.now(UTC)
+        self._debounce_new_value: Any = None
+        self._debounce_old_value: Any = None
+        self._debounce_counted: bool = False
+        self._listeners: list[CALLBACK_TYPE] = []
+
+        # Incremented whenever values exposed as attributes change
+        self.revision: int = 0
+        self.updated: bool = False
+        self.last_updated: datetime = datetime.now(UTC)
+        self.new_value: Any = ""
+        self.old_value: Any = ""
+
+        numeric_mode: NumericMode = NumericMode(
+            entry.options.get(CONF_NUMERIC_MODE, NumericMode.OFF)
         )
+        numeric_threshold: float = float(entry.options.get(CONF_NUMERIC_THRESHOLD) or 0)
+
+        # Helpers watching more than one entity, or defined by a pattern, keep
+        # per source values in a source table. Structural diff and debounce
+        # are single entity only
+        self.sources: SourceTable | None = None
+
+        if len(self.source_entity_ids) > 1 or self.source_matcher is not None:
+            self.sources = SourceTable(numeric_mode, numeric_threshold)
+
+            for source_entity_id in self.source_entity_ids:
+                self.sources.add(
+                    source_entity_id, self.get_current_state(source_entity_id)
+                )
+
+        self.structural_diff: bool = self.sources is None and entry.options.get(
+            CONF_STRUCTURAL_DIFF, False
+        )
+        self.change_filter: ChangeFilter | StructuralDiff = (
+            StructuralDiff()
+            if self.structural_diff
+            else ChangeFilter(numeric_mode, numeric_threshold)
+        )
+        self.restore_runtime_state()
 
         self.uom: str = self.get_uom()
         self.text: str = ""
-        self.supress_update_listener: bool = False
 
-        self.new_value: Any = entry.options.get(CONF_NEW_VALUE, "")
-        self.old_value: Any = entry.options.get(CONF_OLD_VALUE, "")
         self.create_text_from_template()
+        self.async_schedule_clear()
 
     # ------------------------------------------------------------------
-    async def async_reset(self) -> None:
-        """Reset."""
+    def restore_runtime_state(self) -> None:
+        """Restore runtime state from the runtime store.
+
+        Older versions kept the runtime state in the config entry options, it is
+        moved to the runtime store the first time the entry is set up.
+        """
+
+        record: dict[str, Any] | None = self.runtime_store.get(self.entry.entry_id)
+        stored: bool = record is not None
+
+        if record is None:
+            if CONF_NEW_VALUE in self.entry.options:
+                record = {
+                    key: self.entry.options.get(key) for key in RUNTIME_STATE_KEYS
+                }
+                self.hass.config_entries.async_update_entry(
+                    self.entry,
+                    data={
+                        key: value
+                        for key, value in self.entry.data.items()
+                        if key not in RUNTIME_STATE_KEYS
+                    },
+                    options={
+                        key: value
+                        for key, value in self.entry.options.items()
+                        if key not in RUNTIME_STATE_KEYS
+                    },
+                )
+            elif self.sources is None:
+                record = {
+                    CONF_NEW_VALUE: self.get_current_state(),
+                    CONF_OLD_VALUE: self.get_current_state(),
+                }
+            else:
+                record = {}
+
+        if self.structural_diff and ATTR_VALUE_HASH in record:
+            # Only the hash of the structure is stored, the current value
+            # is used when it is unchanged since the record was written
+            current: Any = self.get_current_state()
+            self.new_value = (
+                current if stable_hash(current) == record[ATTR_VALUE_HASH] else ""
+            )
+            self.old_value = ""
+        else:
+            self.new_value = record.get(CONF_NEW_VALUE, "")
+            self.old_value = record.get(CONF_OLD_VALUE, "")
+
+        self.updated = record.get(CONF_UPDATED) or False
+        self.change_filter.reported(self.new_value)
+
+        if self.structural_diff:
+            self.change_filter.changes = record.get(ATTR_CHANGES) or {}
+
+        if self.sources is not None:
+            self.sources.restore(
+                record.get(ATTR_SOURCES) or {}, record.get(ATTR_CHANGED_SOURCES) or []
+            )
+            self.source_entity_id = record.get(CONF_ENTITY_ID, self.source_entity_id)
+
+        if record.get(CONF_LAST_UPDATED):
+            self.last_updated = datetime.fromisoformat(record[CONF_LAST_UPDATED])
+
+        if not stored:
+            self.update_runtime_state()
+
+    # ------------------------------------------------------------------
+    def get_current_state(self, entity_id: str | None = None) -> Any:
+        """Get current state."""
+        tmp_state: Any = ""
+        state: State | None = self.hass.states.get(
+            entity_id or self.source_entity_id
+        )
+
+        if state is not None:
+            if CONF_ATTRIBUTE in self.entry.options:
+                tmp_state = state.attributes.get(self.entry.options[CONF_ATTRIBUTE])
+            else:
+                tmp_state = state.state
+
+        return tmp_state
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_track_sources(self, subscriber: StateChangeSubscriber) -> CALLBACK_TYPE:
+        """Subscribe to state changes of the sources.
+
+        Sources of a helper defined by a pattern follow the source index, only
+        entities entering or leaving the matched set are subscribed or
+        unsubscribed.
+        """
+
+        subscription = self.state_dispatcher.async_subscribe(
+            self.source_entity_ids, subscriber
+        )
+
+        if self.source_matcher is None:
+            return subscription
+
+        @callback
+        def sources_changed(added: list[str], removed: list[str]) -> None:
+            """Matched set changed."""
+
+            for entity_id in removed:
+                self.sources.remove(entity_id)
+
+            for entity_id in added:
+                self.sources.add(entity_id, self.get_current_state(entity_id))
+
+            self.source_entity_ids = list(self.sources)
+            subscription.async_remove(removed)
+            subscription.async_add(added)
+
+            if removed:
+                self.revision += 1
+                self.update_runtime_state()
+                self.async_update_listeners()
+
+        unregister: CALLBACK_TYPE = self.source_index.async_register(
+            self.source_matcher, self.source_entity_ids, sources_changed
+        )
+
+        @callback
+        def unsubscribe() -> None:
+            """Unsubscribe."""
+            unregister()
+            subscription()
+
+        return unsubscribe
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for state changes."""
+
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove listener."""
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners."""
+
+        for update_callback in self._listeners:
+            update_callback()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_schedule_clear(self) -> None:
+        """Schedule clear of updated at last updated + clear updates after."""
+
+        if not self.updated:
+            self.expiry_scheduler.async_cancel(self.entry.entry_id)
+            return
+
+        self.expiry_scheduler.async_schedule(
+            self.entry.entry_id,
+            self.last_updated
+            + timedelta(minutes=self.entry.options[CONF_CLEAR_UPDATES_AFTER_MINUTES]),
+            self.async_clear,
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_clear(
+        self, _deadline: datetime | None = None, update_listeners: bool = True
+    ) -> None:
+        """Clear updated."""
+
+        if self.metrics_registry.enabled and self.updated:
+            self.metrics.increment("clears")
 
+        self.revision += 1
         self.updated = False
         self.text = ""
 
-        self.update_config()
-        await self.coordinator.async_refresh()
+        if self.sources is not None:
+            self.sources.clear_changed()
+
+        self.expiry_scheduler.async_cancel(self.entry.entry_id)
+        self.update_runtime_state()
+
+        if update_listeners:
+            self.async_update_listeners()
 
     # ------------------------------------------------------------------
-    def update_state(self, new_value: Any, old_value: Any) -> None:
-        """Update state."""
+    @callback
+    def async_unload(self) -> None:
+        """Unload."""
+        self.metrics_registry.async_remove_helper(self.entry.entry_id)
+        self.expiry_scheduler.async_cancel(self.entry.entry_id)
+        self._async_cancel_debounce()
+
+        if self.sources is not None or self.structural_diff:
+            # Do not keep the unloaded helper alive through its lazy record
+            self.runtime_store.async_set(self.entry.entry_id, self.runtime_state())
+
+    # ------------------------------------------------------------------
+    async def async_reset(self) -> None:
+        """Reset."""
+        self.async_clear()
+
+    # ------------------------------------------------------------------
+    def update_state(
+        self, new_value: Any, old_value: Any, entity_id: str | None = None
+    ) -> bool:
+        """Update state.
+
+        Returns True if a change was applied, a debounced change is applied
+        later and listeners are updated then.
+        """
+
+        if self.sources is not None:
+            return self.apply_source_change(
+                entity_id, new_value, old_value, datetime.now(UTC)
+            )
 
         if old_value in (STATE_UNKNOWN, STATE_UNAVAILABLE):
-            if self.new_value not in ("", new_value):
-                self.old_value = self.new_value
-                self.new_value = new_value
-            else:
-                return
+            if self.new_value in ("", new_value):
+                if self.metrics_registry.enabled:
+                    self.metrics.increment("unchanged")
+                return False
 
-        else:
-            self.new_value = new_value
-            self.old_value = old_value
+            old_value = self.new_value
 
-        if self.new_value != self.old_value:
-            self.updated = True
-            self.last_updated = datetime.now(UTC)
-            self.create_text_from_template()
+        if self.debounce_seconds > 0:
+            self.debounce_state(new_value, old_value)
+            return False
 
-            self.update_config()
+        return self.apply_change(new_value, old_value, datetime.now(UTC))
 
+    # ------------------------------------------------------------------
+    def apply_change(self, new_value: Any, old_value: Any, when: datetime) -> bool:
+        """Apply change."""
+
+        if not self.change_filter.is_change(new_value, old_value):
+            if self.metrics_registry.enabled:
+                self.metrics.increment("unchanged")
+            return False
+
+        if self.metrics_registry.enabled:
+            self.metrics.increment("triggers")
+
+        self.change_filter.reported(new_value)
+        self.revision += 1
+        self.new_value = new_value
+        self.old_value = old_value
+        self.updated = True
+        self.last_updated = when
+        self.history.append(when, old_value, new_value)
         self.uom = self.get_uom()
+        self.create_text_from_template()
+
+        self.update_runtime_state()
+        self.async_schedule_clear()
+        self.async_fire_change_event()
+        return True
 
     # ------------------------------------------------------------------
-    def update_config(self) -> None:
-        """Update config."""
+    def apply_source_change(
+        self, entity_id: str, new_value: Any, old_value: Any, when: datetime
+    ) -> bool:
+        """Apply change of one source of a helper watching more than one entity."""
+
+        if (source := self.sources.get(entity_id)) is None or (
+            old_value in (STATE_UNKNOWN, STATE_UNAVAILABLE)
+            and source.new_value in ("", new_value)
+        ):
+            if self.metrics_registry.enabled:
+                self.metrics.increment("unchanged")
+            return False
 
-        tmp_options: dict[str, Any] = self.entry.options.copy()
-        tmp_options[CONF_NEW_VALUE] = self.new_value
-        tmp_options[CONF_OLD_VALUE] = self.old_value
-        tmp_options[CONF_UPDATED] = self.updated
-        tmp_options[CONF_LAST_UPDATED] = self.last_updated.isoformat()
+        if old_value in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            old_value = source.new_value
+
+        if not source.is_change(new_value, old_value):
+            if self.metrics_registry.enabled:
+                self.metrics.increment("unchanged")
+            return False
+
+        if self.metrics_registry.enabled:
+            self.metrics.increment("triggers")
+
+        source.set(new_value, old_value, when)
+        self.sources.mark_changed(entity_id)
+        self.source_entity_id = entity_id
+        self.revision += 1
+        self.new_value = new_value
+        self.old_value = old_value
+        self.updated = True
+        self.last_updated = when
+        self.history.append(when, old_value, new_value, entity_id)
+        self.uom = self.get_uom()
+        self.create_text_from_template()
 
-        self.supress_update_listener = True
+        self.update_runtime_state()
+        self.async_schedule_clear()
+        self.async_fire_change_event()
+        return True
 
-        self.hass.config_entries.async_update_entry(
-            self.entry, data=tmp_options, options=tmp_options
-        )
+    # ------------------------------------------------------------------
+    @callback
+    def async_fire_change_event(self) -> None:
+        """Fire the latest change on the bus, or add it to the batch event."""
+
+        if self.event_mode is EventMode.OFF:
+            return
+
+        change: dict[str, Any] = {
+            CONF_ENTITY_ID: self.entity_id,
+            ATTR_SOURCE: self.source_entity_id,
+            CONF_ATTRIBUTE: self.entry.options.get(CONF_ATTRIBUTE),
+        }
+
+        if self.structural_diff:
+            # Only the changed paths, not both whole structures
+            change[ATTR_CHANGED_KEYS] = self.change_filter.changed_keys
+            change[ATTR_CHANGES] = self.change_filter.changes
+        else:
+            change[CONF_OLD_VALUE] = self.old_value
+            change[CONF_NEW_VALUE] = self.new_value
+
+        change[ATTR_TIMESTAMP] = self.last_updated.isoformat()
+
+        if self.change_event_batcher is not None:
+            self.change_event_batcher.async_add(change)
+        else:
+            self.hass.bus.async_fire(EVENT_CHANGED, change)
 
     # ------------------------------------------------------------------
-    async def async_update(self) -> None:
-        """Update."""
+    def debounce_state(self, new_value: Any, old_value: Any) -> None:
+        """Collapse a burst of changes into one.
 
-        if self.updated and (
-            self.last_updated
-            + timedelta(minutes=self.entry.options[CONF_CLEAR_UPDATES_AFTER_MINUTES])
-        ) < datetime.now(UTC):
-            self.updated = False
-            self.text = ""
+        The first old value and the last new value are kept. The timer is not
+        rearmed per event, when it fires it rearms itself for the rest of the
+        window counted from the last event.
+        """
+
+        self._debounce_last = datetime.now(UTC)
+        self._debounce_new_value = new_value
 
-            self.update_config()
-            await self.coordinator.async_refresh()
+        if self.metrics_registry.enabled:
+            self.metrics.increment("debounced")
+            self._debounce_counted = True
+
+        if self._debounce_unsub is None:
+            self._debounce_old_value = old_value
+            self._debounce_unsub = async_call_later(
+                self.hass, self.debounce_seconds, self._async_debounce_fire
+            )
 
     # ------------------------------------------------------------------
-    async def async_config_entry_refresh(self) -> None:
-        """Config entry hass been updated."""
-        await self.async_update()
+    @callback
+    def _async_debounce_fire(self, now: datetime) -> None:
+        """Apply the debounced change when the window has been quiet."""
+
+        remaining: float = (
+            self._debounce_last
+            + timedelta(seconds=self.debounce_seconds)
+            - dt_util.utcnow()
+        ).total_seconds()
+
+        if remaining > 0:
+            self._debounce_unsub = async_call_later(
+                self.hass, remaining, self._async_debounce_fire
+            )
+            return
+
+        self._debounce_unsub = None
+
+        # The last held event is counted as the trigger or unchanged event
+        if self._debounce_counted and self.metrics_registry.enabled:
+            self.metrics.increment("debounced", -1)
+
+        self._debounce_counted = False
+
+        if self.apply_change(
+            self._debounce_new_value, self._debounce_old_value, self._debounce_last
+        ):
+            self.async_update_listeners()
 
     # ------------------------------------------------------------------
-    def get_uom(self) -> str:
-        """Get uom."""
+    @callback
+    def _async_cancel_debounce(self) -> None:
+        """Cancel pending debounced change."""
 
-        if self.entry.options.get(CONF_ENTITY_ID, "") != "":
-            try:
-                tmp_uom: str = get_unit_of_measurement(
-                    self.hass,
-                    self.entry.options.get(CONF_ENTITY_ID),
-                )
+        if self._debounce_unsub is not None:
+            self._debounce_unsub()
+            self._debounce_unsub = None
 
-                if tmp_uom is not None:
-                    if tmp_uom == "%":
-                        return tmp_uom
+        self._debounce_counted = False
 
-                    return " " + tmp_uom
-            except HomeAssistantError:
-                pass
+    # ------------------------------------------------------------------
+    def runtime_state(self) -> dict[str, Any]:
+        """Runtime state record."""
+
+        record: dict[str, Any] = {
+            CONF_UPDATED: self.updated,
+            CONF_LAST_UPDATED: self.last_updated.isoformat(),
+        }
+
+        if self.structural_diff:
+            # Large structures are not stored whole, only their hash and the
+            # changed paths
+            record[ATTR_VALUE_HASH] = stable_hash(self.new_value)
+            record[ATTR_CHANGES] = self.change_filter.changes
+        else:
+            record[CONF_NEW_VALUE] = self.new_value
+            record[CONF_OLD_VALUE] = self.old_value
 
-        return ""
+        if self.sources is not None:
+            record[CONF_ENTITY_ID] = self.source_entity_id
+            record[ATTR_SOURCES] = self.sources.as_dict()
+            record[ATTR_CHANGED_SOURCES] = self.sources.changed_sources()
+
+        return record
+
+    # ------------------------------------------------------------------
+    def update_runtime_state(self) -> None:
+        """Update runtime state in the runtime store.
+
+        The source table, and the hash of a structure, are only built when
+        the store writes, so a helper watching many entities or a large
+        structure does not do it on every change.
+        """
+
+        record: RuntimeRecord = (
+            self.runtime_state
+            if self.sources is not None or self.structural_diff
+            else self.runtime_state()
+        )
+
+        if self.metrics_registry.enabled:
+            start: float = perf_counter()
+            self.runtime_store.async_set(self.entry.entry_id, record)
+            self.metrics.observe("runtime_state_update", perf_counter() - start)
+        else:
+            self.runtime_store.async_set(self.entry.entry_id, record)
+
+    # ------------------------------------------------------------------
+    async def async_config_entry_refresh(self) -> None:
+        """Config entry hass been updated."""
+        self.async_schedule_clear()
+
+    # ------------------------------------------------------------------
+    def get_uom(self) -> str:
+        """Get uom."""
+        return self.source_metadata.async_get_uom(self.source_entity_id)
 
     # ------------------------------------------------------------------
     def create_text_from_template(self) -> None:
         """Create text from template."""
 
-        if self.updated and self.entry.options.get(CONF_TEXT_TEMPLATE, ""):
+        if self.updated and self.text_template:
             values: dict[str, Any] = {
-                CONF_ENTITY_ID: self.entry.options.get(CONF_ENTITY_ID, ""),
+                CONF_ENTITY_ID: self.source_entity_id,
                 CONF_ATTRIBUTE: self.entry.options.get(CONF_ATTRIBUTE, ""),
-                CONF_NEW_VALUE: self.new_value + self.uom,
-                CONF_OLD_VALUE: self.old_value + self.uom,
                 CONF_LAST_UPDATED: self.last_updated.isoformat(),
             }
 
+            if self.structural_diff:
+                # Whole structures are only made into text if the template
+                # renders them
+                values[CONF_NEW_VALUE] = LazyText(self.new_value, self.uom)
+                values[CONF_OLD_VALUE] = LazyText(self.old_value, self.uom)
+                values[ATTR_CHANGED_KEYS] = self.change_filter.changed_keys
+                values[ATTR_CHANGES] = self.change_filter.changes
+            else:
+                values[CONF_NEW_VALUE] = f"{self.new_value}{self.uom}"
+                values[CONF_OLD_VALUE] = f"{self.old_value}{self.uom}"
+
+            if self.sources is not None:
+                values[ATTR_CHANGED_SOURCES] = self.sources.changed_sources()
+
             try:
-                value_template: Template | None = Template(
-                    str(self.entry.options.get(CONF_TEXT_TEMPLATE)), self.hass
-                )
+                start: float = perf_counter()
+                value_template: Template = self.template_cache.get(self.text_template)
 
                 self.text = value_template.async_render(values)
+
+                if self.metrics_registry.enabled:
+                    self.metrics.observe("template_render", perf_counter() - start)
             except (TypeError, TemplateError) as e:
-                self.create_issue_template(
-                    str(e),
-                    value_template.template,
-                    TRANSLATION_KEY_MISSING_ENTITY,
+                self.issues.async_template_error(
+                    self.entry.entry_id, self.text_template, str(e)
                 )
+            else:
+                self.issues.async_template_ok(self.entry.entry_id)
 
         else:
             self.text = ""
-
-    # ------------------------------------------------------------------
-    def create_issue_template(
-        self,
-        error_txt: str,
-        template: str,
-        translation_key: str,
-    ) -> None:
-        """Create issue on entity."""
-
-        if (
-            self.last_error_template != template
-            or error_txt != self.last_error_txt_template
-        ):
-            ir.async_create_issue(
-                self.hass,
-                DOMAIN,
-                DOMAIN_NAME + datetime.now().isoformat(),
-                issue_domain=DOMAIN,
-                is_fixable=False,
-                severity=ir.IssueSeverity.WARNING,
-                translation_key=translation_key,
-                translation_placeholders={
-                    "error_txt": error_txt,
-                    "template": template,
-                },
-            )
-            self.last_error_template = template
-            self.last_error_txt_template = error_txt
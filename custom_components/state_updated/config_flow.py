@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
-from datetime import UTC, datetime
+import re
 from typing import Any, cast
 
 import voluptuous as vol
@@ -16,11 +16,15 @@ from homeassistant.const import (
     CONF_ICON,
     CONF_NAME,
 )
-from homeassistant.core import State, callback
-from homeassistant.helpers import entity_registry as er, selector
+from homeassistant.helpers import (
+    config_validation as cv,
+    entity_registry as er,
+    selector,
+)
 from homeassistant.helpers.schema_config_entry_flow import (
     SchemaCommonFlowHandler,
     SchemaConfigFlowHandler,
+    SchemaFlowError,
     SchemaFlowFormStep,
     SchemaFlowMenuStep,
 )
@@ -32,17 +36,44 @@ from homeassistant.helpers.selector import (
     TemplateSelector,
 )
 
+from . import hass_util
+from .change_events import EventMode
+from .change_filter import NumericMode
 from .const import (
+    ATTR_TEXT,
+    CONF_ATTRIBUTE_MAX_SIZE,
     CONF_CLEAR_UPDATES_AFTER_MINUTES,
+    CONF_DEBOUNCE_SECONDS,
     CONF_DEFAULT_TEXT_TEMPLATE,
-    CONF_LAST_UPDATED,
+    CONF_ENTITY_PATTERN,
+    CONF_EVENT_MODE,
+    CONF_HISTORY_SIZE,
     CONF_NEW_VALUE,
+    CONF_NUMERIC_MODE,
+    CONF_NUMERIC_THRESHOLD,
     CONF_OLD_VALUE,
+    CONF_PATTERN_TYPE,
+    CONF_SOURCE_AREA,
+    CONF_SOURCE_LABEL,
+    CONF_STRUCTURAL_DIFF,
     CONF_TEXT_TEMPLATE,
-    CONF_UPDATED,
+    CONF_UNRECORDED_ATTRIBUTES,
+    DEFAULT_HISTORY_SIZE,
     DOMAIN,
 )
-from .hass_util import Translate
+from .source_index import PatternType, SourceMatcher
+from .source_table import ATTR_CHANGED_SOURCES
+from .structural_diff import ATTR_CHANGED_KEYS, ATTR_CHANGES
+
+# Attributes which can be excluded from the recorder
+RECORDER_ATTRIBUTES: list[str] = [
+    CONF_NEW_VALUE,
+    CONF_OLD_VALUE,
+    ATTR_TEXT,
+    ATTR_CHANGED_KEYS,
+    ATTR_CHANGES,
+    ATTR_CHANGED_SOURCES,
+]
 
 
 # ------------------------------------------------------------------
@@ -54,27 +85,82 @@ async def user_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
             vol.Optional(
                 CONF_NAME,
             ): selector.TextSelector(),
-            vol.Required(
+            vol.Optional(
                 CONF_ENTITY_ID,
             ): selector.EntitySelector(
-                selector.EntitySelectorConfig(multiple=False),
+                selector.EntitySelectorConfig(multiple=True),
                 # selector.EntitySelectorConfig(domain=SENSOR_DOMAIN, multiple=False),
             ),
+            vol.Optional(
+                CONF_ENTITY_PATTERN,
+            ): selector.TextSelector(),
+            vol.Optional(
+                CONF_PATTERN_TYPE, default=PatternType.GLOB
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[pattern_type.value for pattern_type in PatternType],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                    translation_key=CONF_PATTERN_TYPE,
+                )
+            ),
+            vol.Optional(
+                CONF_SOURCE_AREA,
+            ): selector.AreaSelector(),
+            vol.Optional(
+                CONF_SOURCE_LABEL,
+            ): selector.LabelSelector(),
         }
     )
 
 
+# ------------------------------------------------------------------
+async def validate_user_setup(
+    handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
+) -> dict[str, Any]:
+    """Validate user setup.
+
+    Either entities or a pattern defines the sources. A single entity is
+    stored as a string, like entries created before more than one entity
+    could be selected.
+    """
+
+    entity_ids: list[str] = cv.ensure_list(user_input.get(CONF_ENTITY_ID))
+
+    try:
+        matcher: SourceMatcher | None = SourceMatcher.from_options(user_input)
+    except re.error as err:
+        raise SchemaFlowError("invalid_pattern") from err
+
+    if matcher is not None:
+        if entity_ids:
+            raise SchemaFlowError("entity_or_pattern")
+
+        user_input.pop(CONF_ENTITY_ID, None)
+        return user_input
+
+    user_input.pop(CONF_PATTERN_TYPE, None)
+
+    if not entity_ids:
+        raise SchemaFlowError("missing_selection")
+
+    user_input[CONF_ENTITY_ID] = entity_ids[0] if len(entity_ids) == 1 else entity_ids
+
+    return user_input
+
+
 # ------------------------------------------------------------------
 async def init_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
     """Return schema for the init step."""
     options = handler.options.copy()
+    entity_ids: list[str] = cv.ensure_list(options.get(CONF_ENTITY_ID))
+    entity_id: str = entity_ids[0] if entity_ids else ""
 
     dev_id: str = ""
 
-    if handler.parent_handler.init_step == "user":
+    if handler.parent_handler.init_step == "user" and entity_id:
         try:
             entity_registry = er.async_get(handler.parent_handler.hass)
-            dev_id = entity_registry.async_get(options[CONF_ENTITY_ID]).device_id
+            dev_id = entity_registry.async_get(entity_id).device_id
         except AttributeError:
             dev_id = ""
 
@@ -86,8 +172,10 @@ async def init_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
             vol.Optional(
                 CONF_ATTRIBUTE,
             ): selector.AttributeSelector(
-                selector.AttributeSelectorConfig(entity_id=options[CONF_ENTITY_ID])
-            ),
+                selector.AttributeSelectorConfig(entity_id=entity_id)
+            )
+            if entity_id
+            else selector.TextSelector(),
             vol.Optional(
                 CONF_ICON,
             ): IconSelector(),
@@ -101,11 +189,76 @@ async def init_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
                     unit_of_measurement="minutes",
                 )
             ),
+            vol.Optional(
+                CONF_NUMERIC_MODE, default=NumericMode.OFF
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[mode.value for mode in NumericMode],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                    translation_key=CONF_NUMERIC_MODE,
+                )
+            ),
+            vol.Optional(CONF_NUMERIC_THRESHOLD, default=0): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    step="any",
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_STRUCTURAL_DIFF, default=False
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                CONF_EVENT_MODE, default=EventMode.OFF
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[mode.value for mode in EventMode],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                    translation_key=CONF_EVENT_MODE,
+                )
+            ),
+            vol.Optional(CONF_DEBOUNCE_SECONDS, default=0): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=3600,
+                    step="any",
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="seconds",
+                )
+            ),
+            vol.Optional(
+                CONF_HISTORY_SIZE, default=DEFAULT_HISTORY_SIZE
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=1000,
+                    step=1,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_UNRECORDED_ATTRIBUTES, default=[]
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=RECORDER_ATTRIBUTES,
+                    multiple=True,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(CONF_ATTRIBUTE_MAX_SIZE, default=0): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=65536,
+                    step=1,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="characters",
+                )
+            ),
             vol.Optional(
                 CONF_TEXT_TEMPLATE,
                 default=options.get(
                     CONF_TEXT_TEMPLATE,
-                    await Translate(
+                    await hass_util.Translate(
                         handler.parent_handler.hass
                     ).async_get_localized_str(
                         CONF_DEFAULT_TEXT_TEMPLATE,
@@ -118,7 +271,11 @@ async def init_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
 
 
 CONFIG_FLOW: dict[str, SchemaFlowFormStep | SchemaFlowMenuStep] = {
-    "user": SchemaFlowFormStep(user_schema, next_step="user_extra"),
+    "user": SchemaFlowFormStep(
+        user_schema,
+        validate_user_input=validate_user_setup,
+        next_step="user_extra",
+    ),
     "user_extra": SchemaFlowFormStep(init_schema),
 }
 OPTIONS_FLOW: dict[str, SchemaFlowFormStep | SchemaFlowMenuStep] = {
@@ -139,38 +296,24 @@ class ConfigFlowHandler(SchemaConfigFlowHandler, domain=DOMAIN):
 
         if CONF_NAME in options:
             title: str = options[CONF_NAME]
+        elif CONF_ENTITY_ID not in options:
+            title = (
+                " ".join(
+                    str(options[key])
+                    for key in (
+                        CONF_ENTITY_PATTERN,
+                        CONF_SOURCE_AREA,
+                        CONF_SOURCE_LABEL,
+                    )
+                    if options.get(key)
+                )
+                + " updated"
+            )
+        elif isinstance(options[CONF_ENTITY_ID], list):
+            title = f"{len(options[CONF_ENTITY_ID])} entities updated"
         else:
             title = options[CONF_ENTITY_ID]
             title = title[title.find(".") + 1 :] + " updated"
             title = title.replace("_", " ")
 
         return cast(str, title)
-
-    # ------------------------------------------------------------------
-    @callback
-    def async_config_flow_finished(self, options: Mapping[str, Any]) -> None:
-        """Take necessary actions after the config flow is finished, if needed.
-
-        The options parameter contains config entry options, which is the union of user
-        input from the config flow steps.
-        """
-        options[CONF_NEW_VALUE] = options[CONF_OLD_VALUE] = self.get_current_state(
-            options
-        )
-
-        options[CONF_UPDATED] = False
-        options[CONF_LAST_UPDATED] = datetime.now(UTC).isoformat()
-
-    # ------------------------------------------------------------------
-    def get_current_state(self, user_input: dict[str, Any]) -> Any:
-        """Get current state."""
-        tmp_state: Any = ""
-        state: State | None = self.hass.states.get(user_input[CONF_ENTITY_ID])
-
-        if state is not None:
-            if CONF_ATTRIBUTE in user_input:
-                tmp_state = state.attributes.get(user_input[CONF_ATTRIBUTE])
-            else:
-                tmp_state = state.state
-
-        return tmp_state
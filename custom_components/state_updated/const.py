@@ -12,9 +12,51 @@ CONF_OLD_VALUE = "old_value"
 CONF_LAST_UPDATED = "last_updated"
 CONF_UPDATED = "updated"
 CONF_TEXT_TEMPLATE = "text_template"
+CONF_DEBOUNCE_SECONDS = "debounce_seconds"
+CONF_HISTORY_SIZE = "history_size"
+CONF_NUMERIC_MODE = "numeric_mode"
+CONF_NUMERIC_THRESHOLD = "numeric_threshold"
+CONF_STRUCTURAL_DIFF = "structural_diff"
+CONF_ENTITY_PATTERN = "entity_pattern"
+CONF_PATTERN_TYPE = "pattern_type"
+CONF_SOURCE_AREA = "source_area"
+CONF_SOURCE_LABEL = "source_label"
+CONF_EVENT_MODE = "event_mode"
+CONF_UNRECORDED_ATTRIBUTES = "unrecorded_attributes"
+CONF_ATTRIBUTE_MAX_SIZE = "attribute_max_size"
+
+DEFAULT_HISTORY_SIZE = 10
+
+ATTR_TEXT = "text"
+
+ATTR_ONLY_UPDATED = "only_updated"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_LIMIT = "limit"
+ATTR_ENABLED = "enabled"
+ATTR_RESET = "reset"
+ATTR_WRITE_DELAY = "write_delay"
+ATTR_MIN_WRITE_INTERVAL = "min_write_interval"
+
+EVENT_CHANGED = f"{DOMAIN}_changed"
+EVENT_CHANGED_BATCH = f"{DOMAIN}_changed_batch"
+
+SERVICE_RESET_ALL = "reset_all"
+SERVICE_RESET_ENTITY = "reset_entity"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_GET_METRICS = "get_metrics"
+SERVICE_SET_METRICS = "set_metrics"
+SERVICE_SET_STORE_OPTIONS = "set_store_options"
+
+# Runtime state is merged into one write, at most one write per interval (seconds)
+DEFAULT_STORE_WRITE_DELAY = 5
+DEFAULT_STORE_MIN_WRITE_INTERVAL = 30
+
+TEMPLATE_CACHE_MAX_SIZE = 256
 
 CONF_DEFAULT_TEXT_TEMPLATE = "config.step.user_extra.data.default_text_template"
 
 TRANSLATION_KEY = DOMAIN
 
 TRANSLATION_KEY_MISSING_ENTITY = "missing_entity"
+TRANSLATION_KEY_TEMPLATE_ERROR = "template_error"
@@ -0,0 +1,46 @@
+"""Diagnostics support for State updated."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import CommonConfigEntry
+from .component_api import ComponentApi
+from .metrics import async_get_metrics
+from .services import async_get_shared_stats
+
+
+# ------------------------------------------------------------------
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: CommonConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+
+    component_api: ComponentApi = entry.runtime_data.component_api
+    metrics = async_get_metrics(hass)
+
+    return {
+        "options": dict(entry.options),
+        "runtime_state": {
+            "entity_id": component_api.entity_id,
+            "updated": component_api.updated,
+            "last_updated": component_api.last_updated.isoformat(),
+            "history_size": len(component_api.history),
+            "sources": len(component_api.source_entity_ids),
+            "changed_sources": len(component_api.sources.changed)
+            if component_api.sources is not None
+            else None,
+        },
+        "metrics": {
+            "enabled": metrics.enabled,
+            "helper": component_api.metrics.as_dict(),
+            "helper_setup_ms": round(
+                metrics.setup_seconds.get(entry.entry_id, 0.0) * 1000, 4
+            ),
+            "total": metrics.total.as_dict(),
+            "setup": metrics.setup_as_dict(),
+        },
+        **async_get_shared_stats(hass),
+    }
@@ -0,0 +1,198 @@
+"""Expiry scheduler.
+
+One scheduler is shared by all State updated helpers. It keeps a min-heap of
+pending clear deadlines and arms a single point in time listener for the
+earliest one. The timer is cancelled when Home Assistant stops.
+"""
+
+from collections.abc import Callable
+from datetime import datetime
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, LOGGER
+
+DATA_EXPIRY_SCHEDULER: HassKey["ExpiryScheduler"] = HassKey(
+    f"{DOMAIN}_expiry_scheduler"
+)
+
+# Rebuild the heap when stale entries outnumber live ones by this factor
+_COMPACT_FACTOR = 2
+_COMPACT_MIN_SIZE = 64
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_EXPIRY_SCHEDULER)
+def async_get_expiry_scheduler(hass: HomeAssistant) -> "ExpiryScheduler":
+    """Get the expiry scheduler shared by all entries."""
+    return ExpiryScheduler(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class ExpiryScheduler:
+    """Expiry scheduler.
+
+    Rescheduling a key pushes a new heap item and leaves the old one behind.
+    Stale items are skipped when they reach the top of the heap, so both
+    schedule and cancel are O(log n).
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._deadlines: dict[str, datetime] = {}
+        self._actions: dict[str, Callable[[datetime], None]] = {}
+        self._sequence = count()
+
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._armed_at: datetime | None = None
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of pending deadlines."""
+        return len(self._deadlines)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_schedule(
+        self,
+        key: str,
+        deadline: datetime,
+        action: Callable[[datetime], None],
+    ) -> None:
+        """Schedule action for key at deadline, replacing any pending one."""
+
+        self._deadlines[key] = deadline
+        self._actions[key] = action
+        heappush(self._heap, (deadline, next(self._sequence), key))
+
+        self._compact()
+        self._async_arm()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_cancel(self, key: str) -> None:
+        """Cancel pending deadline for key."""
+
+        if self._deadlines.pop(key, None) is None:
+            return
+
+        self._actions.pop(key, None)
+        self._compact()
+        self._async_arm()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all deadlines and the timer."""
+
+        self._heap.clear()
+        self._deadlines.clear()
+        self._actions.clear()
+        self._async_cancel_timer()
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_stop(self, _event: Event) -> None:
+        """Home Assistant stops."""
+        self.async_shutdown()
+
+    # ------------------------------------------------------------------
+    def _drop_stale(self) -> None:
+        """Pop heap items which no longer match the pending deadline."""
+
+        while self._heap:
+            deadline, _, key = self._heap[0]
+
+            if self._deadlines.get(key) == deadline:
+                return
+
+            heappop(self._heap)
+
+    # ------------------------------------------------------------------
+    def _compact(self) -> None:
+        """Rebuild the heap when it is mostly stale items."""
+
+        if len(self._heap) > max(
+            _COMPACT_MIN_SIZE, _COMPACT_FACTOR * len(self._deadlines)
+        ):
+            self._heap = [
+                item for item in self._heap if self._deadlines.get(item[2]) == item[0]
+            ]
+            heapify(self._heap)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_cancel_timer(self) -> None:
+        """Cancel armed timer."""
+
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        self._armed_at = None
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the timer for the earliest deadline."""
+
+        self._drop_stale()
+
+        if not self._heap:
+            self._async_cancel_timer()
+            return
+
+        earliest: datetime = self._heap[0][0]
+
+        if self._armed_at == earliest:
+            return
+
+        self._async_cancel_timer()
+        self._armed_at = earliest
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_fire, earliest
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        """Run all actions which are due."""
+
+        self._unsub_timer = None
+        self._armed_at = None
+
+        now = max(now, dt_util.utcnow())
+        due: list[tuple[Callable[[datetime], None], datetime]] = []
+
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heappop(self._heap)
+
+            if self._deadlines.get(key) != deadline:
+                continue
+
+            del self._deadlines[key]
+            due.append((self._actions.pop(key), deadline))
+
+        try:
+            for action, deadline in due:
+                # One failing helper must not keep the others from clearing
+                try:
+                    action(deadline)
+                except Exception:
+                    LOGGER.exception("Error clearing expired State updated helper")
+        finally:
+            self._async_arm()
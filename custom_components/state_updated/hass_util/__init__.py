@@ -3,55 +3,115 @@
 This module contains utility functions and classes for Home Assistant.
 It includes functions for handling retries, managing timers, and translating text.
 
+Submodules are imported on first attribute access, so importing the package
+does not import a submodule, or its external imports, before it is used.
+
 External imports:
+    circuit_breaker: None
+    field_plan: None
     handle_retries: None
-    storage_json: jsonpickle
+    hass_util: None
+    storage_json: orjson, and jsonpickle only to read files of older versions
     timer_trigger: None
-    translate: aiofiles, orjson
+    translate: orjson
 """
 
-from .config_update import (
-    check_supress_config_update_listener,
-    set_supress_config_update_listener,
-)
-from .enum_ext import EnumExt
-from .handle_retries import (
-    HandleRetries,
-    HandleRetriesException,
-    RetryStopException,
-    handle_retries,
-)
-from .hass_util import (
-    ArgumentException,
-    AsyncException,
-    async_get_user_language,
-    async_hass_add_executor_job,
-    object_to_state_attr_dict,
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .circuit_breaker import (
+        CircuitBreaker,
+        CircuitOpenException,
+        CircuitState,
+        circuit_breaker,
+    )
+    from .config_update import (
+        check_supress_config_update_listener,
+        set_supress_config_update_listener,
+    )
+    from .enum_ext import EnumExt
+    from .field_plan import FieldPlan, get_field_plan
+    from .handle_retries import (
+        HandleRetries,
+        HandleRetriesException,
+        RetryStats,
+        RetryStopException,
+        handle_retries,
+    )
+    from .hass_util import (
+        ArgumentException,
+        AsyncException,
+        async_get_user_language,
+        async_hass_add_executor_job,
+        object_to_state_attr_dict,
+    )
+    from .json_ext import DictToObject, JsonExt
+    from .storage_json import StorageJson, StorageJsonMigrationException, StoreMigrate
+    from .timer_trigger import TimerTrigger, TimerTriggerErrorEnum
+    from .translate import NumberSelectorConfigTranslate, Translate
+
+# Attribute name -> submodule
+_LAZY_ATTRS: dict[str, str] = {
+    "ArgumentException": "hass_util",
+    "AsyncException": "hass_util",
+    "CircuitBreaker": "circuit_breaker",
+    "CircuitOpenException": "circuit_breaker",
+    "CircuitState": "circuit_breaker",
+    "DictToObject": "json_ext",
+    "EnumExt": "enum_ext",
+    "FieldPlan": "field_plan",
+    "HandleRetries": "handle_retries",
+    "HandleRetriesException": "handle_retries",
+    "JsonExt": "json_ext",
+    "NumberSelectorConfigTranslate": "translate",
+    "RetryStats": "handle_retries",
+    "RetryStopException": "handle_retries",
+    "StorageJson": "storage_json",
+    "StorageJsonMigrationException": "storage_json",
+    "StoreMigrate": "storage_json",
+    "TimerTrigger": "timer_trigger",
+    "TimerTriggerErrorEnum": "timer_trigger",
+    "Translate": "translate",
+    "async_get_user_language": "hass_util",
+    "async_hass_add_executor_job": "hass_util",
+    "check_supress_config_update_listener": "config_update",
+    "circuit_breaker": "circuit_breaker",
+    "get_field_plan": "field_plan",
+    "handle_retries": "handle_retries",
+    "object_to_state_attr_dict": "hass_util",
+    "set_supress_config_update_listener": "config_update",
+}
+
+__all__ = sorted(_LAZY_ATTRS)
+
+# Lazy attributes named like their submodule
+_SHADOWED_ATTRS: tuple[str, ...] = tuple(
+    name for name, module_name in _LAZY_ATTRS.items() if name == module_name
 )
-from .json_ext import DictToObject, JsonExt
-from .storage_json import StorageJson, StoreMigrate
-from .timer_trigger import TimerTrigger, TimerTriggerErrorEnum
-from .translate import NumberSelectorConfigTranslate, Translate
-
-__all__ = [
-    "ArgumentException",
-    "AsyncException",
-    "DictToObject",
-    "EnumExt",
-    "HandleRetries",
-    "HandleRetriesException",
-    "JsonExt",
-    "NumberSelectorConfigTranslate",
-    "RetryStopException",
-    "StorageJson",
-    "StoreMigrate",
-    "TimerTrigger",
-    "TimerTriggerErrorEnum",
-    "Translate",
-    "async_get_user_language",
-    "async_hass_add_executor_job",
-    "check_supress_config_update_listener",
-    "handle_retries",
-    "object_to_state_attr_dict",
-    "set_supress_config_update_listener",
-]
+
+
+# ------------------------------------------------------------------
+def __getattr__(name: str) -> Any:
+    """Import the submodule of name on first access."""
+
+    if (module_name := _LAZY_ATTRS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value: Any = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+
+    # Importing a submodule binds it on the package, which shadows a lazy
+    # attribute of the same name, like the handle_retries decorator
+    for shadowed in _SHADOWED_ATTRS:
+        if isinstance(globals().get(shadowed), ModuleType):
+            del globals()[shadowed]
+
+    return value
+
+
+# ------------------------------------------------------------------
+def __dir__() -> list[str]:
+    """Module attributes, including the ones not imported yet."""
+    return sorted({*globals(), *_LAZY_ATTRS})
@@ -0,0 +1,367 @@
+"""Circuit breaker for functions and async functions.
+
+A circuit breaker is shared per resource key. It is closed while calls
+succeed, opens after failure_threshold consecutive failures and then fails
+fast with CircuitOpenException until recovery_timeout has passed. Half open,
+at most half_open_max_calls probe calls are let through, success_threshold
+successful probes close it again and a failed probe opens it again.
+
+CircuitOpenException is a RetryStopException, so a breaker used inside
+handle_retries stops the retries while it is open:
+
+    @handle_retries(retries=3, retry_delay=1, backoff_factor=2.0, jitter=True)
+    @circuit_breaker(key="my_resource")
+    async def async_fetch(): ...
+
+External imports: None
+"""
+
+from collections.abc import Callable
+from enum import StrEnum
+from functools import partial, wraps
+from inspect import iscoroutinefunction
+from threading import Lock
+from time import monotonic
+from typing import Any, ClassVar
+
+from .handle_retries import RetryStopException
+
+# Called with the resource key, the old and the new state
+StateChangeCallback = Callable[[str, "CircuitState", "CircuitState"], None]
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitState(StrEnum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitOpenException(RetryStopException):
+    """Call rejected, the circuit is open."""
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class CircuitBreaker:
+    """Circuit breaker.
+
+    Use CircuitBreaker.get(key) to get the breaker shared by all callers of
+    a resource.
+    """
+
+    __breakers: ClassVar[dict[str, "CircuitBreaker"]] = {}
+
+    def __init__(
+        self,
+        key: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 1,
+        failure_exceptions: list | None = None,
+    ) -> None:
+        """Init.
+
+        Args:
+            key (str): Resource key.
+            failure_threshold (int, optional): Consecutive failures which open the circuit. Defaults to 5.
+            recovery_timeout (float, optional): Seconds open before probing. Defaults to 30.0.
+            half_open_max_calls (int, optional): Concurrent probe calls when half open. Defaults to 1.
+            success_threshold (int, optional): Successful probes which close the circuit. Defaults to 1.
+            failure_exceptions (list | None, optional): Exceptions counted as failures, None counts all. Defaults to None.
+
+        """
+        self.key: str = key
+        self.failure_threshold: int = max(failure_threshold, 1)
+        self.recovery_timeout: float = max(recovery_timeout, 0.0)
+        self.half_open_max_calls: int = max(half_open_max_calls, 1)
+        self.success_threshold: int = max(success_threshold, 1)
+        self.failure_exceptions: tuple = tuple(failure_exceptions or (Exception,))
+
+        self._state: CircuitState = CircuitState.CLOSED
+        self._lock: Lock = Lock()
+        self._failures: int = 0
+        self._probe_successes: int = 0
+        self._probes: int = 0
+        self._opened_at: float = 0.0
+        self._listeners: list[StateChangeCallback] = []
+
+        self.calls: int = 0
+        self.successes: int = 0
+        self.failures: int = 0
+        self.rejected: int = 0
+        self.opened: int = 0
+
+    # ------------------------------------------------------
+    @classmethod
+    def get(cls, key: str, **kwargs: Any) -> "CircuitBreaker":
+        """Get the breaker of a resource key, kwargs are used on creation."""
+
+        if (breaker := cls.__breakers.get(key)) is None:
+            breaker = cls.__breakers[key] = cls(key, **kwargs)
+
+        return breaker
+
+    # ------------------------------------------------------
+    @classmethod
+    def remove(cls, key: str) -> None:
+        """Remove the breaker of a resource key."""
+        cls.__breakers.pop(key, None)
+
+    # ------------------------------------------------------
+    @property
+    def state(self) -> CircuitState:
+        """State, an open circuit turns half open after recovery_timeout."""
+
+        if self._state is CircuitState.OPEN:
+            with self._lock:
+                self._check_recovery()
+
+        return self._state
+
+    # ------------------------------------------------------
+    def add_listener(self, state_changed: StateChangeCallback) -> Callable[[], None]:
+        """Add a state change callback, called with key, old and new state."""
+
+        self._listeners.append(state_changed)
+
+        # -------------------------
+        def remove() -> None:
+            if state_changed in self._listeners:
+                self._listeners.remove(state_changed)
+
+        return remove
+
+    # ------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Counters."""
+
+        return {
+            "state": self.state.value,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+    # ------------------------------------------------------
+    def reset(self) -> None:
+        """Close the circuit."""
+
+        with self._lock:
+            changed: tuple | None = self._set_state(CircuitState.CLOSED)
+
+        self._notify(changed)
+
+    # ------------------------------------------------------
+    def _set_state(self, state: CircuitState) -> tuple | None:
+        """Set state, the lock is held. Returns the change to notify."""
+
+        if state is self._state:
+            return None
+
+        old_state: CircuitState = self._state
+        self._state = state
+        self._failures = 0
+        self._probe_successes = 0
+        self._probes = 0
+
+        if state is CircuitState.OPEN:
+            self._opened_at = monotonic()
+            self.opened += 1
+
+        return (old_state, state)
+
+    # ------------------------------------------------------
+    def _notify(self, changed: tuple | None) -> None:
+        """Call the state change callbacks, outside the lock."""
+
+        if changed is None:
+            return
+
+        for state_changed in list(self._listeners):
+            state_changed(self.key, *changed)
+
+    # ------------------------------------------------------
+    def _check_recovery(self) -> tuple | None:
+        """Turn half open after recovery_timeout, the lock is held."""
+
+        if (
+            self._state is CircuitState.OPEN
+            and monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            return self._set_state(CircuitState.HALF_OPEN)
+
+        return None
+
+    # ------------------------------------------------------
+    def _before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenException. Returns if it is a probe."""
+
+        with self._lock:
+            changed: tuple | None = self._check_recovery()
+            probe: bool = self._state is CircuitState.HALF_OPEN
+            rejected: bool = self._state is CircuitState.OPEN or (
+                probe and self._probes >= self.half_open_max_calls
+            )
+
+            if rejected:
+                self.rejected += 1
+            else:
+                self.calls += 1
+                self._probes += probe
+
+        self._notify(changed)
+
+        if rejected:
+            raise CircuitOpenException(f"Circuit {self.key} is open")
+
+        return probe
+
+    # ------------------------------------------------------
+    def _after_call(self, probe: bool, exp: BaseException | None) -> None:
+        """Record the result of an admitted call."""
+
+        changed: tuple | None = None
+        failed: bool = exp is not None and isinstance(exp, self.failure_exceptions)
+
+        with self._lock:
+            # A probe which finished after the state changed is not counted
+            probe = probe and self._state is CircuitState.HALF_OPEN
+
+            if probe:
+                self._probes -= 1
+
+            if failed:
+                self.failures += 1
+                self._failures += 1
+
+                if probe or self._failures >= self.failure_threshold:
+                    changed = self._set_state(CircuitState.OPEN)
+            else:
+                self.successes += 1
+                self._failures = 0
+
+                if probe:
+                    self._probe_successes += 1
+
+                    if self._probe_successes >= self.success_threshold:
+                        changed = self._set_state(CircuitState.CLOSED)
+
+        self._notify(changed)
+
+    # ------------------------------------------------------
+    def _release(self, probe: bool) -> None:
+        """Release the probe slot of a call ended without a result, like a cancel."""
+
+        if not probe:
+            return
+
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._probes -= 1
+
+    # ------------------------------------------------------
+    def __call__(self, func):
+        """Decorate func with the breaker."""
+
+        # -------------------------
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.execute(func, *args, **kwargs)
+
+        # -------------------------
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            return await self.async_execute(func, *args, **kwargs)
+
+        if iscoroutinefunction(func):
+            return async_wrapper
+
+        return wrapper
+
+    # ------------------------------------------------------
+    def execute(self, func: Callable, *args, **kwargs):
+        """Call func through the breaker."""
+
+        probe: bool = self._before_call()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as err:
+            self._after_call(probe, err)
+            raise
+        except BaseException:
+            self._release(probe)
+            raise
+
+        self._after_call(probe, None)
+        return result
+
+    # ------------------------------------------------------
+    async def async_execute(self, func: Callable, *args, **kwargs):
+        """Await func through the breaker."""
+
+        probe: bool = self._before_call()
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as err:
+            self._after_call(probe, err)
+            raise
+        except BaseException:
+            # Cancelled, counted as neither success nor failure
+            self._release(probe)
+            raise
+
+        self._after_call(probe, None)
+        return result
+
+
+# ------------------------------------------------------
+def circuit_breaker(
+    func=None,
+    *,
+    key: str | None = None,
+    failure_threshold: int = 5,
+    recovery_timeout: float = 30.0,
+    half_open_max_calls: int = 1,
+    success_threshold: int = 1,
+    failure_exceptions: list | None = None,
+):
+    """Decorator to call the method/function through a circuit breaker.
+
+    The breaker is shared by key, the qualified name of the function if no
+    key is given. The settings are used when the breaker is created.
+    """  # noqa: D401
+
+    if func is None:
+        return partial(
+            circuit_breaker,
+            key=key,
+            failure_threshold=failure_threshold,
+            recovery_timeout=recovery_timeout,
+            half_open_max_calls=half_open_max_calls,
+            success_threshold=success_threshold,
+            failure_exceptions=failure_exceptions,
+        )
+
+    breaker: CircuitBreaker = CircuitBreaker.get(
+        key or f"{func.__module__}.{func.__qualname__}",
+        failure_threshold=failure_threshold,
+        recovery_timeout=recovery_timeout,
+        half_open_max_calls=half_open_max_calls,
+        success_threshold=success_threshold,
+        failure_exceptions=failure_exceptions,
+    )
+
+    wrapper = breaker(func)
+    wrapper.circuit_breaker = breaker
+    return wrapper
@@ -0,0 +1,232 @@
+"""Field plan serializer.
+
+Converts objects to and from json ready values, driven by the field list of
+their class. The field plan of a class is worked out once, from
+storage_fields___, dataclass fields or __slots__, and cached. Other classes
+are encoded from their __dict__, class annotations alone do not declare
+fields, they may not name every attribute set in __init__. Values are left
+in types orjson encodes natively, like datetime and enums, and restored from
+the field annotations when decoded.
+
+Attributes ending with ___ are hidden and never stored.
+
+External imports: None
+"""
+
+from collections.abc import Callable
+from dataclasses import fields as dataclass_fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+Decoder = Callable[[Any], Any]
+
+PRIMITIVE_TYPES: frozenset[type] = frozenset((str, int, float, bool, NoneType))
+
+# Class -> field plan, None when the class does not declare its fields
+_FIELD_PLANS: dict[type, "FieldPlan | None"] = {}
+
+
+# ------------------------------------------------------------------
+def is_hidden(name: str) -> bool:
+    """Hidden attributes are not stored."""
+    return name.endswith("___")
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class FieldPlan:
+    """Stored fields of a class and the decoders of the fields needing one."""
+
+    __slots__ = ("cls", "decoders", "fields")
+
+    def __init__(self, cls: type, fields: tuple[str, ...]) -> None:
+        """Init."""
+        self.cls: type = cls
+        self.fields: tuple[str, ...] = fields
+        self.decoders: dict[str, Decoder] = {}
+
+    # ------------------------------------------------------------------
+    def build_decoders(self) -> None:
+        """Decoders from the field annotations."""
+
+        try:
+            hints: dict[str, Any] = get_type_hints(self.cls)
+        except (NameError, TypeError):
+            hints = {}
+
+        for name in self.fields:
+            if (hint := hints.get(name)) is not None and (
+                decoder := build_decoder(hint)
+            ) is not None:
+                self.decoders[name] = decoder
+
+    # ------------------------------------------------------------------
+    def encode(self, obj: Any) -> dict[str, Any]:
+        """Encode the fields of obj, unset slots are skipped."""
+
+        return {
+            name: encode_value(getattr(obj, name))
+            for name in self.fields
+            if hasattr(obj, name)
+        }
+
+    # ------------------------------------------------------------------
+    def decode_into(self, obj: Any, data: dict[str, Any]) -> None:
+        """Set the fields of obj from data, unknown keys are ignored."""
+
+        decoders: dict[str, Decoder] = self.decoders
+
+        for name in self.fields:
+            if name not in data:
+                continue
+
+            value: Any = data[name]
+
+            if value is not None and (decoder := decoders.get(name)) is not None:
+                value = decoder(value)
+
+            object.__setattr__(obj, name, value)
+
+    # ------------------------------------------------------------------
+    def decode(self, data: dict[str, Any]) -> Any:
+        """Create an object from data, without calling __init__."""
+
+        obj: Any = self.cls.__new__(self.cls)
+        self.decode_into(obj, data)
+        return obj
+
+
+# ------------------------------------------------------------------
+def declared_fields(cls: type) -> tuple[str, ...] | None:
+    """Stored fields declared by a class, None if it does not declare any."""
+
+    if (fields := getattr(cls, "storage_fields___", None)) is not None:
+        return tuple(fields)
+
+    if is_dataclass(cls):
+        return tuple(
+            field.name for field in dataclass_fields(cls) if not is_hidden(field.name)
+        )
+
+    names: list[str] = []
+
+    for klass in reversed(cls.__mro__):
+        slots: str | tuple[str, ...] = klass.__dict__.get("__slots__", ())
+
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if (
+                not is_hidden(name)
+                and name not in names
+                and name not in ("__dict__", "__weakref__")
+            ):
+                names.append(name)
+
+    return tuple(names) if names else None
+
+
+# ------------------------------------------------------------------
+def get_field_plan(cls: type) -> FieldPlan | None:
+    """Field plan of a class, worked out once per class."""
+
+    try:
+        return _FIELD_PLANS[cls]
+    except KeyError:
+        pass
+
+    if (fields := declared_fields(cls)) is None:
+        _FIELD_PLANS[cls] = None
+        return None
+
+    # Cached before the decoders are built, a class can refer to itself
+    plan: FieldPlan = FieldPlan(cls, fields)
+    _FIELD_PLANS[cls] = plan
+    plan.build_decoders()
+    return plan
+
+
+# ------------------------------------------------------------------
+def encode_value(value: Any) -> Any:
+    """Encode a value to types orjson encodes natively."""
+
+    value_type: type = type(value)
+
+    if value_type in PRIMITIVE_TYPES:
+        return value
+
+    if value_type is dict:
+        return {key: encode_value(item) for key, item in value.items()}
+
+    if value_type in (list, tuple, set, frozenset):
+        return [encode_value(item) for item in value]
+
+    if isinstance(value, (datetime, date, Enum)):
+        return value
+
+    if (plan := get_field_plan(value_type)) is not None:
+        return plan.encode(value)
+
+    if hasattr(value, "__dict__"):
+        return {
+            key: encode_value(item)
+            for key, item in vars(value).items()
+            if not is_hidden(key)
+        }
+
+    return value
+
+
+# ------------------------------------------------------------------
+def build_decoder(hint: Any) -> Decoder | None:
+    """Decoder for a field annotation, None when the value is used as is."""
+
+    origin: Any = get_origin(hint)
+    args: tuple[Any, ...] = get_args(hint)
+
+    if origin in (Union, UnionType):
+        decoders: list[Decoder] = [
+            decoder
+            for arg in args
+            if arg is not NoneType and (decoder := build_decoder(arg)) is not None
+        ]
+        # Only an optional single type is decoded, other unions are kept as is
+        return decoders[0] if len(decoders) == 1 and len(args) <= 2 else None
+
+    if origin in (list, tuple, set, frozenset):
+        if not args or (item_decoder := build_decoder(args[0])) is None:
+            return None if origin is list else origin
+
+        return lambda value: origin(
+            None if item is None else item_decoder(item) for item in value
+        )
+
+    if origin is dict:
+        if len(args) != 2 or (item_decoder := build_decoder(args[1])) is None:
+            return None
+
+        return lambda value: {
+            key: None if item is None else item_decoder(item)
+            for key, item in value.items()
+        }
+
+    if not isinstance(hint, type) or hint in PRIMITIVE_TYPES:
+        return None
+
+    if issubclass(hint, datetime):
+        return lambda value: (
+            datetime.fromisoformat(value) if isinstance(value, str) else value
+        )
+
+    if issubclass(hint, date):
+        return lambda value: (
+            date.fromisoformat(value) if isinstance(value, str) else value
+        )
+
+    if issubclass(hint, Enum):
+        return hint
+
+    if (plan := get_field_plan(hint)) is not None:
+        return lambda value: plan.decode(value) if isinstance(value, dict) else value
+
+    return None
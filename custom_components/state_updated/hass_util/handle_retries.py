@@ -3,17 +3,39 @@
 This decorator allows you to specify the number of retries and the delay between retries.
 It can be used with both synchronous and asynchronous functions.
 
+Retry state lives in a per call object, so concurrent calls through the same
+decorator do not share it. The delay is fixed unless backoff_factor makes it
+grow exponentially, capped by max_delay, optionally with full jitter, and an
+optional deadline bounds the total time of a call.
+An async attempt still running when the deadline passes is cancelled.
+
 External imports: None
 """
 
-# ruff: noqa: C901
-
-from asyncio import sleep as asyncio_sleep
+from asyncio import get_running_loop, sleep as asyncio_sleep, timeout as asyncio_timeout
 from collections.abc import Callable
 from functools import partial, wraps
 from inspect import iscoroutinefunction
-from time import sleep
+from random import uniform
+from time import monotonic, sleep
 from types import FunctionType
+from typing import Any
+
+# Settings which set_parms_dyn can change for a call
+RETRY_SETTINGS: frozenset[str] = frozenset(
+    (
+        "backoff_factor",
+        "deadline",
+        "jitter",
+        "max_delay",
+        "raise_last_exception",
+        "raise_original_exception",
+        "retries",
+        "retry_delay",
+        "retry_on_exceptions",
+        "stop_on_exceptions",
+    )
+)
 
 
 # ------------------------------------------------------
@@ -38,6 +60,198 @@ class HandleRetriesException(Exception):
     """
 
 
+# ------------------------------------------------------
+# ------------------------------------------------------
+class RetryStats:
+    """Retry statistics of one call."""
+
+    __slots__ = (
+        "attempts",
+        "deadline_exceeded",
+        "delay",
+        "elapsed",
+        "last_exception",
+        "succeeded",
+    )
+
+    def __init__(self) -> None:
+        """Init."""
+        self.attempts: int = 0
+        self.delay: float = 0.0
+        self.elapsed: float = 0.0
+        self.deadline_exceeded: bool = False
+        self.succeeded: bool = False
+        self.last_exception: Exception | None = None
+
+    # ------------------------------------------------------
+    @property
+    def retries(self) -> int:
+        """Number of retries, the first attempt is not a retry."""
+        return max(self.attempts - 1, 0)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+class RetryCall:
+    """Retry state of one call.
+
+    Starts as a copy of the decorator settings, set_parms_dyn changes
+    only this copy.
+    """
+
+    __slots__ = (
+        "backoff_factor",
+        "deadline",
+        "func_name",
+        "jitter",
+        "max_delay",
+        "raise_last_exception",
+        "raise_original_exception",
+        "retries",
+        "retry_delay",
+        "retry_on_exceptions",
+        "start",
+        "stats",
+        "stop_on_exceptions",
+    )
+
+    def __init__(self, handle_retries: "HandleRetries", func_name: str) -> None:
+        """Init."""
+        self.func_name: str = func_name
+        self.retries: int = handle_retries.retries
+        self.retry_delay: float = handle_retries.retry_delay
+        self.backoff_factor: float = handle_retries.backoff_factor
+        self.max_delay: float = handle_retries.max_delay
+        self.jitter: bool = handle_retries.jitter
+        self.deadline: float | None = handle_retries.deadline
+        self.raise_last_exception: bool = handle_retries.raise_last_exception
+        self.raise_original_exception: bool = handle_retries.raise_original_exception
+        self.retry_on_exceptions: list | None = handle_retries.retry_on_exceptions
+        self.stop_on_exceptions: list | None = handle_retries.stop_on_exceptions
+
+        self.start: float = monotonic()
+        self.stats: RetryStats = RetryStats()
+
+    # ------------------------------------------------------
+    def set_parms_dyn(self, parm_dict: dict | None) -> None:
+        """Set parameters dynamic."""
+
+        if not isinstance(parm_dict, dict):
+            return
+
+        for name, value in parm_dict.items():
+            if name in RETRY_SETTINGS:
+                setattr(self, name, value)
+
+    # ------------------------------------------------------
+    def check_not_on_loop(self) -> None:
+        """Raise if a sync call would sleep in the event loop."""
+
+        if self.retries <= 1 or self.retry_delay <= 0:
+            return
+
+        try:
+            get_running_loop()
+        except RuntimeError:
+            return
+
+        raise HandleRetriesException(
+            f"{self.func_name} would sleep between retries in the event loop, "
+            "use an async function or run it in the executor"
+        )
+
+    # ------------------------------------------------------
+    def next_delay(self, attempt: int) -> float:
+        """Delay before the next attempt, exponential with full jitter."""
+
+        delay: float = min(
+            self.max_delay, self.retry_delay * self.backoff_factor**attempt
+        )
+
+        if self.jitter:
+            return uniform(0.0, delay)
+
+        return delay
+
+    # ------------------------------------------------------
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, None without a deadline."""
+
+        if self.deadline is None:
+            return None
+
+        return max(self.deadline - (monotonic() - self.start), 0.0)
+
+    # ------------------------------------------------------
+    def expired(self, exp: Exception, attempt: int) -> None:
+        """Handle an attempt cancelled by the deadline.
+
+        Raises when the exception should be raised.
+        """
+
+        self.stats.last_exception = exp
+        self.stats.deadline_exceeded = True
+        self.raise_exception(exp, attempt)
+
+    # ------------------------------------------------------
+    def failed(self, exp: Exception, attempt: int) -> float | None:
+        """Handle a failed attempt.
+
+        Returns the delay before the next attempt, or None to stop and
+        return None. Raises when the exception should be raised.
+        """
+
+        self.stats.last_exception = exp
+
+        if isinstance(exp, RetryStopException):
+            raise exp
+
+        last_attempt: bool = (
+            (
+                self.retry_on_exceptions is not None
+                and exp.__class__ not in self.retry_on_exceptions
+            )
+            or (
+                self.stop_on_exceptions is not None
+                and exp.__class__ in self.stop_on_exceptions
+            )
+            or attempt >= self.retries - 1
+        )
+        delay: float = 0.0 if last_attempt else self.next_delay(attempt)
+
+        if (
+            not last_attempt
+            and self.deadline is not None
+            and monotonic() - self.start + delay > self.deadline
+        ):
+            last_attempt = True
+            self.stats.deadline_exceeded = True
+
+        if not last_attempt:
+            self.stats.delay += delay
+            return delay
+
+        self.raise_exception(exp, attempt)
+        return None
+
+    # ------------------------------------------------------
+    def raise_exception(self, exp: Exception, attempt: int) -> None:
+        """Raise for the last attempt, if raise_last_exception is set."""
+
+        if self.raise_last_exception:
+            if self.raise_original_exception:
+                raise exp
+
+            if self.stats.deadline_exceeded:
+                raise HandleRetriesException(
+                    f"Deadline of {self.deadline}s exceeded for {self.func_name}"
+                ) from exp
+
+            raise HandleRetriesException(
+                f"Retry {attempt} failed for {self.func_name}"
+            ) from exp
+
+
 # ------------------------------------------------------
 # ------------------------------------------------------
 class HandleRetries:
@@ -56,6 +270,11 @@ class HandleRetries:
         raise_original_exception: bool = True,
         retry_on_exceptions: list | None = None,
         stop_on_exceptions: list | None = None,
+        backoff_factor: float = 1.0,
+        max_delay: float = 60.0,
+        jitter: bool = False,
+        deadline: float | None = None,
+        on_stats: Callable[[RetryStats], None] | None = None,
     ):
         """Init.
 
@@ -66,6 +285,11 @@ class HandleRetries:
             raise_original_exception (bool, optional): _description_. Defaults to True.
             retry_on_exceptions (list | Exception | None, optional): _description_. Defaults to None.
             stop_on_exceptions (list | Exception | None, optional): _description_. Defaults to None.
+            backoff_factor (float, optional): Delay multiplier per retry, 1.0 keeps it fixed. Defaults to 1.0.
+            max_delay (float, optional): Maximum delay between retries. Defaults to 60.0.
+            jitter (bool, optional): Full jitter, a random delay up to the backoff delay. Defaults to False.
+            deadline (float | None, optional): Maximum seconds for a call, including retries. Defaults to None.
+            on_stats (Callable[[RetryStats], None] | None, optional): Called with the statistics of each call. Defaults to None.
 
         """
         self.retries: int = retries if retries > 0 else 1
@@ -74,8 +298,47 @@ class HandleRetries:
         self.raise_original_exception: bool = raise_original_exception
         self.retry_on_exceptions: list | None = retry_on_exceptions
         self.stop_on_exceptions: list | None = stop_on_exceptions
+        self.backoff_factor: float = backoff_factor if backoff_factor > 1 else 1.0
+        self.max_delay: float = max(max_delay, self.retry_delay)
+        self.jitter: bool = jitter
+        self.deadline: float | None = deadline
+        self.on_stats: Callable[[RetryStats], None] | None = on_stats
+
+        # Totals of all calls
+        self.calls: int = 0
+        self.attempts: int = 0
+        self.failures: int = 0
+        self.deadlines_exceeded: int = 0
+        self.delay: float = 0.0
+
+    # ------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Totals of all calls."""
+
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.attempts - self.calls,
+            "failures": self.failures,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "delay": round(self.delay, 4),
+        }
+
+    # ------------------------------------------------------
+    def _done(self, call: RetryCall) -> None:
+        """Add the statistics of a finished call to the totals."""
+
+        stats: RetryStats = call.stats
+        stats.elapsed = monotonic() - call.start
+
+        self.calls += 1
+        self.attempts += stats.attempts
+        self.failures += not stats.succeeded
+        self.deadlines_exceeded += stats.deadline_exceeded
+        self.delay += stats.delay
 
-        self.func_self = None
+        if self.on_stats is not None:
+            self.on_stats(stats)
 
     # ------------------------------------------------------
     def __call__(self, func):
@@ -84,158 +347,98 @@ class HandleRetries:
         Args:
             func (_type_): _description_
 
-        Raises:
-            e: _description_
-            e: _description_
-
         Returns:
             _type_: _description_
 
         """
 
         # -------------------------
-        def decorator_wrap(func):
-            # -------------------------
-            def check_retry_on_exceptions(exp: Exception) -> bool:
-                """Check if the exception is in the retry_on_exceptions list."""
-                if self.retry_on_exceptions is None:
-                    return True
-
-                if exp.__class__ in self.retry_on_exceptions:
-                    return True
-
-                return False
-
-            # -------------------------
-            def check_stop_on_exceptions(exp: Exception) -> bool:
-                """Check if the exception is in the stop_on_exceptions list."""
-                if self.stop_on_exceptions is None:
-                    return False
-
-                if exp.__class__ in self.stop_on_exceptions:
-                    return True
-
-                return False
-
-            # -------------------------
-            def check_exceptions(exp: Exception, attempt: int) -> None:
-                """Check exceptions."""
-
-                if exp.__class__ == RetryStopException:
-                    raise exp
-                if (
-                    not check_retry_on_exceptions(exp)
-                    or check_stop_on_exceptions(exp)
-                    or attempt == self.retries - 1
-                ):
-                    if self.raise_last_exception:
-                        if self.raise_original_exception:
-                            raise exp
-                        raise HandleRetriesException(
-                            f"Retry {attempt} failed for {func.__name__}"
-                        ) from exp
-
-            # -------------------------
-            def set_parms_dyn(parm_dict: dict) -> None:
-                """Set parameters dynamic."""
-
-                if "retries" in parm_dict:
-                    self.retries = parm_dict["retries"]
-                if "retry_delay" in parm_dict:
-                    self.retry_delay = parm_dict["retry_delay"]
-                if "raise_last_exception" in parm_dict:
-                    self.raise_last_exception = parm_dict["raise_last_exception"]
-                if "raise_original_exception" in parm_dict:
-                    self.raise_original_exception = parm_dict[
-                        "raise_original_exception"
-                    ]
-                if "retry_on_exceptions" in parm_dict:
-                    self.retry_on_exceptions = parm_dict["retry_on_exceptions"]
-                if "stop_on_exceptions" in parm_dict:
-                    self.stop_on_exceptions = parm_dict["stop_on_exceptions"]
-
-            # -------------------------
-            def check_for_dyn_parms(func) -> None:
-                """Check dynamic parameters."""
-
-                if func is None:
-                    return
-
-                if hasattr(func, "set_parms_dyn"):
-                    tmp_func = func.set_parms_dyn
-                    # tmp_func = getattr(func, "set_parms_dyn")
-                    tmp_return = tmp_func()
-
-                    if (
-                        tmp_return is not None
-                        and isinstance(tmp_return, dict)
-                        and len(tmp_return) > 0
-                    ):
-                        set_parms_dyn(tmp_return)
-
-            # -------------------------
-            async def async_check_for_dyn_parms(func) -> None:
-                """Check dynamic parameters."""
-
-                if func is None:
-                    return
-
-                if hasattr(func, "async_set_parms_dyn"):
-                    # tmp_func = getattr(func, "async_set_parms_dyn")
-                    tmp_func = func.async_set_parms_dyn
-
-                    if iscoroutinefunction(tmp_func):
-                        tmp_return = await tmp_func()
-
-                        if (
-                            tmp_return is not None
-                            and isinstance(tmp_return, dict)
-                            and len(tmp_return) > 0
-                        ):
-                            set_parms_dyn(tmp_return)
-                            return
-
-                check_for_dyn_parms(func)
-
-            # -------------------------
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                check_for_dyn_parms(self.func_self)
-
-                for attempt in range(self.retries):
-                    try:
-                        if self.func_self is None:
-                            return func(*args, **kwargs)
-                        return func(self.func_self, *args, **kwargs)
-                    except Exception as err:  # noqa: BLE001
-                        check_exceptions(err, attempt)
-
-                    sleep(self.retry_delay)
-                return None
-
-            # -------------------------
-            @wraps(func)
-            async def async_wrapper(*args, **kwargs):
-                await async_check_for_dyn_parms(self.func_self)
-
-                for attempt in range(self.retries):
-                    try:
-                        if self.func_self is None:
-                            return await func(*args, **kwargs)
-                        return await func(self.func_self, *args, **kwargs)
-
-                    except Exception as err:  # noqa: BLE001
-                        check_exceptions(err, attempt)
-                    await asyncio_sleep(self.retry_delay)
-                return None
-
-            # Check if the function is a coroutine function
-            if iscoroutinefunction(func):
-                return async_wrapper
-
-            return wrapper
-
-        return decorator_wrap(func)
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self._execute(None, func, *args, **kwargs)
+
+        # -------------------------
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            return await self._async_execute(None, func, *args, **kwargs)
+
+        # Check if the function is a coroutine function
+        if iscoroutinefunction(func):
+            return async_wrapper
+
+        return wrapper
+
+    # ------------------------------------------------------
+    def _execute(self, func_self, func: Callable, *args, **kwargs):
+        """Call func with retries."""
+
+        call: RetryCall = RetryCall(self, func.__name__)
+
+        if func_self is not None:
+            args = (func_self, *args)
+
+            if hasattr(func_self, "set_parms_dyn"):
+                call.set_parms_dyn(func_self.set_parms_dyn())
+
+        call.check_not_on_loop()
+
+        try:
+            for attempt in range(call.retries):
+                call.stats.attempts += 1
+
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as err:  # noqa: BLE001
+                    if (delay := call.failed(err, attempt)) is None:
+                        return None
+                else:
+                    call.stats.succeeded = True
+                    return result
+
+                sleep(delay)
+            return None
+        finally:
+            self._done(call)
+
+    # ------------------------------------------------------
+    async def _async_execute(self, func_self, func: Callable, *args, **kwargs):
+        """Await func with retries."""
+
+        call: RetryCall = RetryCall(self, func.__name__)
+
+        if func_self is not None:
+            args = (func_self, *args)
+
+            if iscoroutinefunction(getattr(func_self, "async_set_parms_dyn", None)):
+                call.set_parms_dyn(await func_self.async_set_parms_dyn())
+            elif hasattr(func_self, "set_parms_dyn"):
+                call.set_parms_dyn(func_self.set_parms_dyn())
+
+        try:
+            for attempt in range(call.retries):
+                call.stats.attempts += 1
+
+                # No timeout without a deadline
+                timeout = asyncio_timeout(call.remaining())
+
+                try:
+                    async with timeout:
+                        result = await func(*args, **kwargs)
+                except Exception as err:  # noqa: BLE001
+                    if timeout.expired():
+                        call.expired(err, attempt)
+                        return None
+
+                    if (delay := call.failed(err, attempt)) is None:
+                        return None
+                else:
+                    call.stats.succeeded = True
+                    return result
+
+                await asyncio_sleep(delay)
+            return None
+        finally:
+            self._done(call)
 
     # ------------------------------------------------------
     def execute(
@@ -249,8 +452,10 @@ class HandleRetries:
 
         How to call: HandleRetries(retries=3, retry_delay=1).execute(func_self ,(test_func),"Hello world")
         """
-        self.func_self = func_self
-        return self.__call__(func)(*args, **kwargs)
+        if iscoroutinefunction(func):
+            return self._async_execute(func_self, func, *args, **kwargs)
+
+        return self._execute(func_self, func, *args, **kwargs)
 
     # ------------------------------------------------------
     async def async_execute(
@@ -264,8 +469,7 @@ class HandleRetries:
 
         How to call: await HandleRetries(retries=3, retry_delay=1).async_execute(func_self, (async_test_func),"Hello world")
         """
-        self.func_self = func_self
-        return await self.__call__(func)(*args, **kwargs)
+        return await self._async_execute(func_self, func, *args, **kwargs)
 
 
 # ------------------------------------------------------
@@ -278,12 +482,19 @@ def handle_retries(
     raise_original_exception: bool = True,
     retry_on_exceptions: list | None = None,
     stop_on_exceptions: list | None = None,
+    backoff_factor: float = 1.0,
+    max_delay: float = 60.0,
+    jitter: bool = False,
+    deadline: float | None = None,
+    on_stats: Callable[[RetryStats], None] | None = None,
 ):
     """Decorator to handle retries.
 
     It will retry the method/function if it raises an exception up to a specified number of times, with a specified delay.
     It can be used with both synchronous and asynchronous method/functions.
     It will raise the last exception if the number of retries is reached and raise_last_exception is True.
+    One HandleRetries is shared by all calls of the decorated function, its
+    stats() are the totals of those calls.
     """  # noqa: D401
 
     if func is None:
@@ -295,65 +506,46 @@ def handle_retries(
             raise_original_exception=raise_original_exception,
             retry_on_exceptions=retry_on_exceptions,
             stop_on_exceptions=stop_on_exceptions,
+            backoff_factor=backoff_factor,
+            max_delay=max_delay,
+            jitter=jitter,
+            deadline=deadline,
+            on_stats=on_stats,
         )
 
+    retry_handler: HandleRetries = HandleRetries(
+        retries=retries,
+        retry_delay=retry_delay,
+        raise_last_exception=raise_last_exception,
+        raise_original_exception=raise_original_exception,
+        retry_on_exceptions=retry_on_exceptions,
+        stop_on_exceptions=stop_on_exceptions,
+        backoff_factor=backoff_factor,
+        max_delay=max_delay,
+        jitter=jitter,
+        deadline=deadline,
+        on_stats=on_stats,
+    )
+
     # -------------------------
     def decorator_wrap(func):
         # -------------------------
         @wraps(func)
         def wrapper_method(func_self, *args, **kwargs):
-            return HandleRetries(
-                retries=retries,
-                retry_delay=retry_delay,
-                raise_last_exception=raise_last_exception,
-                raise_original_exception=raise_original_exception,
-                retry_on_exceptions=retry_on_exceptions,
-                stop_on_exceptions=stop_on_exceptions,
-            ).execute(func_self, func, *args, **kwargs)
+            return retry_handler.execute(func_self, func, *args, **kwargs)
 
         # -------------------------
         @wraps(func)
         async def async_wrapper_method(func_self, *args, **kwargs):
-            return await HandleRetries(
-                retries=retries,
-                retry_delay=retry_delay,
-                raise_last_exception=raise_last_exception,
-                raise_original_exception=raise_original_exception,
-                retry_on_exceptions=retry_on_exceptions,
-                stop_on_exceptions=stop_on_exceptions,
-            ).async_execute(func_self, func, *args, **kwargs)
-
-        # -------------------------
-        @wraps(func)
-        def wrapper_funktion(*args, **kwargs):
-            return HandleRetries(
-                retries=retries,
-                retry_delay=retry_delay,
-                raise_last_exception=raise_last_exception,
-                raise_original_exception=raise_original_exception,
-                retry_on_exceptions=retry_on_exceptions,
-                stop_on_exceptions=stop_on_exceptions,
-            ).execute(None, func, *args, **kwargs)
-
-        # -------------------------
-        @wraps(func)
-        async def async_wrapper_function(*args, **kwargs):
-            return await HandleRetries(
-                retries=retries,
-                retry_delay=retry_delay,
-                raise_last_exception=raise_last_exception,
-                raise_original_exception=raise_original_exception,
-                retry_on_exceptions=retry_on_exceptions,
-                stop_on_exceptions=stop_on_exceptions,
-            ).async_execute(None, func, *args, **kwargs)
+            return await retry_handler.async_execute(func_self, func, *args, **kwargs)
 
         if "<locals>" in func.__qualname__ or isinstance(func, FunctionType):
-            if iscoroutinefunction(func):
-                return async_wrapper_function
-            return wrapper_funktion
+            return retry_handler(func)
 
         if iscoroutinefunction(func):
             return async_wrapper_method
         return wrapper_method
 
-    return decorator_wrap(func)
+    wrapper = decorator_wrap(func)
+    wrapper.retry_handler = retry_handler
+    return wrapper
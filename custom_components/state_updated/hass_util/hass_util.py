@@ -1,16 +1,22 @@
 """Hass util."""
 
+from asyncio import Lock
 from functools import partial, wraps
 from inspect import iscoroutinefunction
-
-from packaging.version import Version
+from typing import Any
 
 from homeassistant.components.frontend import storage as frontend_store
 from homeassistant.const import (
     MAJOR_VERSION as HASS_MAJOR_VERSION,
     MINOR_VERSION as HASS_MINOR_VERSION,
 )
-from homeassistant.core import HomeAssistant, async_get_hass
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, async_get_hass, callback
+from homeassistant.util.hass_dict import HassKey
+
+DATA_USER_LANGUAGE: HassKey["UserLanguage"] = HassKey(f"{__name__}.user_language")
+
+# From 2025.6 async_user_store returns a UserStore instead of (store, data)
+USER_STORE_OBJECT: bool = (HASS_MAJOR_VERSION, HASS_MINOR_VERSION) >= (2025, 6)
 
 
 # ------------------------------------------------------
@@ -58,28 +64,81 @@ def object_to_state_attr_dict(
 
 
 # ------------------------------------------------------
-async def async_get_user_language() -> str:
-    """Execute a method in async mode in hass."""
+# ------------------------------------------------------
+class UserLanguage:
+    """Language of the owner, falling back to the configured language.
+
+    The owner's frontend user data is looked up once and kept. It is the
+    dict the frontend store updates, so reading the language from it, and
+    hass.config.language, follows changes without another lookup. When the
+    user store supports subscriptions the user data is looked up again
+    after it changed.
+    """
 
-    hass: HomeAssistant = async_get_hass()
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._owner_data: dict[str, Any] | None = None
+        self._lock: Lock = Lock()
+        self._unsub_user_store: CALLBACK_TYPE | None = None
+
+    # ------------------------------------------------------
+    @callback
+    def async_invalidate(self, *_args: Any) -> None:
+        """Look up the owner's user data again on next use."""
+        self._owner_data = None
+
+    # ------------------------------------------------------
+    async def async_get(self) -> str:
+        """Get language."""
+
+        if self._owner_data is None:
+            async with self._lock:
+                if self._owner_data is None:
+                    await self._async_load_owner_data()
+
+        if (
+            self._owner_data
+            and "language" in self._owner_data
+            and "language" in self._owner_data["language"]
+        ):
+            return self._owner_data["language"]["language"]
 
-    language: str = hass.config.language
+        return self.hass.config.language
 
-    owner = await hass.auth.async_get_owner()
+    # ------------------------------------------------------
+    async def _async_load_owner_data(self) -> None:
+        """Load the owner's frontend user data."""
 
-    if Version(f"{HASS_MAJOR_VERSION}.{HASS_MINOR_VERSION}") < Version("2025.6"):
-        if owner is not None:
-            _, owner_data = await frontend_store.async_user_store(hass, owner.id)
+        if (owner := await self.hass.auth.async_get_owner()) is None:
+            return
+
+        if not USER_STORE_OBJECT:
+            _, self._owner_data = await frontend_store.async_user_store(
+                self.hass, owner.id
+            )
+            return
+
+        user_store = await frontend_store.async_user_store(self.hass, owner.id)
+        self._owner_data = user_store.data
+
+        if self._unsub_user_store is None and hasattr(user_store, "async_subscribe"):
+            self._unsub_user_store = user_store.async_subscribe(
+                "language", self.async_invalidate
+            )
+
+
+# ------------------------------------------------------
+async def async_get_user_language() -> str:
+    """Get the owner's frontend language, or the configured language."""
+
+    hass: HomeAssistant = async_get_hass()
 
-            if "language" in owner_data and "language" in owner_data["language"]:
-                language = owner_data["language"]["language"]
-    elif owner is not None:
-        owner_data = await frontend_store.async_user_store(hass, owner.id)
+    if (user_language := hass.data.get(DATA_USER_LANGUAGE)) is None:
+        user_language = hass.data[DATA_USER_LANGUAGE] = UserLanguage(hass)
 
-        owner_data = await frontend_store.async_user_store(hass, owner.id)
-        if "language" in owner_data.data and "language" in owner_data.data["language"]:
-            language = owner_data.data["language"]["language"]
-    return language
+    return await user_language.async_get()
 
 
 # ------------------------------------------------------
@@ -1,17 +1,56 @@
 """Json storage.
 
-External imports: jsonpickle
+The stored fields of a StorageJson subclass are encoded by a field plan,
+see field_plan. Files written by the jsonpickle encoder of older versions
+are read through a migration path and written in the new layout on the next
+write, jsonpickle is only imported for that. It stays a requirement of the
+integration until files of older versions have been migrated, without it
+reading such a file raises StorageJsonMigrationException.
+
+Changes can be coalesced: async_mark_dirty arms a delayed write, which later
+marks push back up to max_write_delay after the first one. The content is
+encoded once, on the event loop, so no live object is read in the executor,
+and the store writes those bytes. A write whose content hash equals the last
+written content is skipped.
+
+External imports: orjson, jsonpickle (only to read files of older versions)
 """
 
 from collections.abc import Callable
+from hashlib import blake2b
 import inspect
-from typing import Any
+from time import monotonic
+from typing import Any, ClassVar
 
-import jsonpickle
+import orjson
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.storage import Store
 
+from .field_plan import FieldPlan, encode_value, get_field_plan, is_hidden
+
+# Key of the stored fields, and of the jsonpickle data of older versions
+DATA_KEY = "fields"
+LEGACY_DATA_KEY = "jsonpickle"
+
+DEFAULT_WRITE_DELAY = 1.0
+DEFAULT_MAX_WRITE_DELAY = 30.0
+
+
+# ------------------------------------------------------------------
+def content_digest(content: bytes) -> bytes:
+    """Hash of json content."""
+    return blake2b(content, digest_size=16).digest()
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class StorageJsonMigrationException(Exception):
+    """Stored data of an older version can not be migrated."""
+
 
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
@@ -48,9 +87,15 @@ class StorageJson:
 
     This class is used to store data in a json file.
 
-    External imports: jsonpickle
+    The stored fields are storage_fields___, or else all attributes not
+    ending with ___. The fields named in storage_fields___ are restored from
+    their annotations, like nested dataclasses.
+
+    External imports: orjson, jsonpickle (only to read files of older versions)
     """
 
+    storage_fields___: ClassVar[tuple[str, ...] | None] = None
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -58,11 +103,17 @@ class StorageJson:
         version: int = 1,
         minor_version: int = 1,
         async_migrate_func: Callable[[int, int, Any], Any] | None = None,
+        write_delay: float = DEFAULT_WRITE_DELAY,
+        max_write_delay: float = DEFAULT_MAX_WRITE_DELAY,
     ) -> None:
-        """Init."""
+        """Init.
+
+        write_delay is the delay of a write armed by async_mark_dirty, every
+        mark pushes it back, but not beyond max_write_delay after the first
+        mark since the last write.
+        """
 
-        self.DICT_KEY___ = "jsonpickle"
-        self.write_hidden_attributes___: bool = False
+        self.DICT_KEY___ = DATA_KEY
         self.hass___ = hass
         self.store___ = StoreMigrate(
             self.hass___,
@@ -72,6 +123,20 @@ class StorageJson:
         )
         self.store___.custom_migrate_func = async_migrate_func
         self.base_class___ = self.__class__ is StorageJson
+        self.field_plan___: FieldPlan | None = get_field_plan(self.__class__)
+
+        self.write_delay___: float = max(write_delay, 0.0)
+        self.max_write_delay___: float = max(max_write_delay, self.write_delay___)
+        self.extra_data___: dict = {}
+        self.dirty_since___: float | None = None
+        self.unsub_write___: CALLBACK_TYPE | None = None
+        self.unsub_final_write___: CALLBACK_TYPE | None = None
+        self.digest___: bytes | None = None
+
+        self.marks___: int = 0
+        self.writes___: int = 0
+        self.writes_avoided___: int = 0
+        self.bytes_written___: int = 0
 
     # ------------------------------------------------------------------
     async def async_read_settings(self) -> dict | None:
@@ -84,83 +149,185 @@ class StorageJson:
         if data is None:
             return None
 
-        if type(data) is dict:
-            if self.DICT_KEY___ in data:
-                jsonpickle.set_encoder_options("json", ensure_ascii=False)
-                tmp_obj = self.decode_data(data[self.DICT_KEY___])
-                del data[self.DICT_KEY___]
+        if type(data) is not dict:
+            self.decode_legacy_data(data)
+            return None
+
+        if self.DICT_KEY___ in data:
+            # The content as read, an unchanged write is skipped
+            self.digest___ = content_digest(json_bytes(data))
+            self.decode_data(data[self.DICT_KEY___])
+            del data[self.DICT_KEY___]
 
-            if len(data) > 0:
-                tmp_dict = data
-        else:
-            tmp_obj = self.decode_data(data)
+        elif LEGACY_DATA_KEY in data:
+            self.decode_legacy_data(data.pop(LEGACY_DATA_KEY))
 
-        if not self.base_class___:
-            if not hasattr(tmp_obj, "__dict__"):
-                return tmp_dict
-            self.__dict__.update(tmp_obj.__dict__)
+        if len(data) > 0:
+            tmp_dict = data
 
         return tmp_dict
 
     # ------------------------------------------------------------------
-    def decode_data(self, data: Any):
-        """Decode data."""
-        return jsonpickle.decode(data)
+    def decode_data(self, data: dict[str, Any]) -> None:
+        """Decode data into the stored fields."""
+
+        if self.base_class___:
+            return
+
+        if self.field_plan___ is not None:
+            self.field_plan___.decode_into(self, data)
+            return
+
+        self.__dict__.update(
+            (key, value) for key, value in data.items() if not is_hidden(key)
+        )
+
+    # ------------------------------------------------------------------
+    def decode_legacy_data(self, data: Any) -> None:
+        """Decode data written by the jsonpickle encoder of older versions.
+
+        Raises StorageJsonMigrationException if jsonpickle is not installed.
+        """
+
+        try:
+            import jsonpickle  # noqa: PLC0415
+        except ImportError as err:
+            raise StorageJsonMigrationException(
+                f"{self.store___.key} was written by an older version and needs "
+                "jsonpickle to be migrated, install jsonpickle or remove the file"
+            ) from err
+
+        tmp_obj = jsonpickle.decode(data)
+
+        if self.base_class___ or not hasattr(tmp_obj, "__dict__"):
+            return
+
+        self.__dict__.update(
+            (key, value)
+            for key, value in tmp_obj.__dict__.items()
+            if not is_hidden(key)
+        )
 
     # ------------------------------------------------------------------
     async def async_write_settings(self, extra_data: dict = {}) -> None:
-        """Write settings."""
+        """Write settings now, unless the content is unchanged."""
 
-        jsonpickle.set_encoder_options("json", ensure_ascii=False)
+        self.extra_data___ = extra_data
+        await self.async_flush(force=True)
 
-        if self.base_class___:
-            await self.store___.async_save(extra_data)
+    # ------------------------------------------------------------------
+    @callback
+    def async_mark_dirty(self, extra_data: dict | None = None) -> None:
+        """Mark changed and arm a coalesced write."""
+
+        if extra_data is not None:
+            self.extra_data___ = extra_data
 
-        else:
-            await self.store___.async_save(
-                {self.DICT_KEY___: self.encode_data(self), **extra_data}
+        self.marks___ += 1
+        now: float = monotonic()
+
+        if self.dirty_since___ is None:
+            self.dirty_since___ = now
+
+        if self.unsub_final_write___ is None:
+            self.unsub_final_write___ = self.hass___.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
             )
 
+        if self.unsub_write___ is not None:
+            self.unsub_write___()
+
+        self.unsub_write___ = async_call_later(
+            self.hass___,
+            max(
+                min(
+                    self.write_delay___,
+                    self.dirty_since___ + self.max_write_delay___ - now,
+                ),
+                0.0,
+            ),
+            self._async_write_later,
+        )
+
+    # ------------------------------------------------------------------
+    async def _async_write_later(self, _now: Any) -> None:
+        """Delayed write."""
+
+        self.unsub_write___ = None
+        await self.async_flush()
+
+    # ------------------------------------------------------------------
+    async def _async_final_write(self, _event: Event) -> None:
+        """Flush on final write."""
+
+        self.unsub_final_write___ = None
+        await self.async_flush()
+
+    # ------------------------------------------------------------------
+    async def async_flush(self, force: bool = False) -> None:
+        """Write pending changes now, unless the content is unchanged."""
+
+        if self.unsub_write___ is not None:
+            self.unsub_write___()
+            self.unsub_write___ = None
+
+        if self.dirty_since___ is None and not force:
+            return
+
+        self.dirty_since___ = None
+
+        data: dict = (
+            self.extra_data___
+            if self.base_class___
+            else {self.DICT_KEY___: self.encode_data(), **self.extra_data___}
+        )
+
+        # A snapshot of the live objects, hashed and written as is
+        content: bytes = json_bytes(data)
+        digest: bytes = content_digest(content)
+
+        if digest == self.digest___:
+            self.writes_avoided___ += 1
+            return
+
+        await self.store___.async_save(orjson.Fragment(content))
+        self.digest___ = digest
+        self.writes___ += 1
+        self.bytes_written___ += len(content)
+
+    # ------------------------------------------------------------------
+    def write_stats(self) -> dict[str, Any]:
+        """Write statistics, bytes are the size of the written json."""
+
+        return {
+            "marks": self.marks___,
+            "writes": self.writes___,
+            "writes_avoided": self.writes_avoided___,
+            "bytes_written": self.bytes_written___,
+            "pending": self.dirty_since___ is not None,
+        }
+
     # ------------------------------------------------------------------
-    def encode_data(self, data: Any):
-        """Encode data."""
-        return jsonpickle.encode(data, unpicklable=True)
+    def encode_data(self) -> dict[str, Any]:
+        """Encode the stored fields to values orjson encodes natively."""
+
+        if self.field_plan___ is not None:
+            return self.field_plan___.encode(self)
+
+        return {
+            key: encode_value(value)
+            for key, value in self.__dict__.items()
+            if not is_hidden(key)
+        }
 
     # ------------------------------------------------------------------
     async def async_remove_settings(self) -> None:
         """Remove settings."""
-        await self.store___.async_remove()
 
-    # ------------------------------------------------------------------
-    def __getstate__(self) -> dict:
-        """Get state."""
-        tmp_dict = self.__dict__.copy()
-        del tmp_dict["write_hidden_attributes___"]
-        del tmp_dict["hass___"]
-        del tmp_dict["store___"]
-        del tmp_dict["DICT_KEY___"]
-        del tmp_dict["base_class___"]
-
-        if self.write_hidden_attributes___ is False:
-            try:
-
-                def remove_hidden_attrib(obj) -> None:
-                    for key in list(obj):
-                        if len(key) > 2 and key[0:2] == "__":
-                            continue
-                        elif hasattr(obj[key], "__dict__"):  # noqa: RET507
-                            remove_hidden_attrib(obj[key].__dict__)
-
-                        # Remove hidden attributes
-                        elif len(key) > 3 and key[-3:] == "___":
-                            del obj[key]
-
-                        elif isinstance(obj[key], list):
-                            for item in obj[key]:
-                                if hasattr(item, "__dict__"):
-                                    remove_hidden_attrib(item.__dict__)
-
-                remove_hidden_attrib(tmp_dict)
-            except Exception:  # noqa: BLE001
-                pass
-        return tmp_dict
+        if self.unsub_write___ is not None:
+            self.unsub_write___()
+            self.unsub_write___ = None
+
+        self.dirty_since___ = None
+        self.digest___ = None
+        await self.store___.async_remove()
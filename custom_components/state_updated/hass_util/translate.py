@@ -1,18 +1,19 @@
 """Translate to localized string.
 
-External imports: aiofiles, orjson
+External imports: orjson
 """
 
+from asyncio import Lock
 from pathlib import Path
+from time import monotonic
 from typing import Any, Literal
 
-import aiofiles
 import orjson
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.selector import NumberSelectorConfig, NumberSelectorMode
 
-from . import async_get_user_language
+from .hass_util import async_get_user_language
 
 
 # ------------------------------------------------------------------
@@ -69,23 +70,115 @@ class NumberSelectorConfigTranslate:
         return await self.translate()
 
 
+# ------------------------------------------------------------------
+def recursive_flatten(prefix: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Return a flattened representation of dict data."""
+    output: dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            output.update(recursive_flatten(f"{prefix}{key}.", value))
+        else:
+            output[f"{prefix}{key}"] = value
+    return output
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class TranslationFile:
+    """Flattened translation file."""
+
+    __slots__ = ("checked", "mtime", "path", "strings")
+
+    def __init__(
+        self, path: Path | None, mtime: float, strings: dict[str, Any]
+    ) -> None:
+        """Init."""
+        self.path: Path | None = path
+        self.mtime: float = mtime
+        self.strings: dict[str, Any] = strings
+        self.checked: float = monotonic()
+
+
+# ------------------------------------------------------------------
+def load_translation_file(
+    language: str, file_name: str, current: TranslationFile | None
+) -> TranslationFile:
+    """Load translation file, current is returned if the file is unchanged.
+
+    Falls back to English when there is no file for the language. Runs in
+    the executor.
+    """
+
+    translations: Path = Path(__file__).parent.parent / "translations"
+
+    for path in (
+        translations / (language + file_name),
+        translations / ("en" + file_name),
+    ):
+        try:
+            mtime: float = path.stat().st_mtime
+        except OSError:
+            continue
+
+        if current is not None and current.path == path and current.mtime == mtime:
+            return current
+
+        return TranslationFile(
+            path, mtime, recursive_flatten("", orjson.loads(path.read_bytes()))
+        )
+
+    return TranslationFile(None, 0.0, {})
+
+
 # ------------------------------------------------------------------
 # ------------------------------------------------------------------
 class Translate:
     """Translate to localized string class.
 
+    Flattened translation files are cached per language. A cached file is
+    checked for changes, by mtime in the executor, at most once per
+    MTIME_CHECK_INTERVAL seconds, and concurrent loads of the same file
+    wait for one load.
+
     External imports: orjson
     """
 
-    __filename: str = ""
-    __json_dict: dict[str, Any] = {}
+    MTIME_CHECK_INTERVAL: float = 30
+
+    __cache: dict[str, TranslationFile] = {}
+    __locks: dict[str, Lock] = {}
     acive_language: str = ""
 
     def __init__(self, hass: HomeAssistant, load_only: str = "") -> None:
-        """Init."""
+        """Init.
+
+        load_only is kept for compatibility, whole files are always cached so
+        lookups outside the prefix do not miss.
+        """
         self.hass = hass
         self.load_only: str = load_only
 
+    # ------------------------------------------------------------------
+    @classmethod
+    async def async_preload(
+        cls,
+        hass: HomeAssistant,
+        languages: list[str] | None = None,
+        file_name: str = ".json",
+    ) -> None:
+        """Load translation files in the executor ahead of the first lookup.
+
+        Without languages the user language is loaded.
+        """
+
+        if languages is None:
+            languages = [await async_get_user_language()]
+
+        translate = cls(hass)
+
+        for language in languages:
+            await translate.async_get_strings(language, file_name)
+
     # ------------------------------------------------------------------
     async def async_get_localized_str(
         self,
@@ -98,61 +191,45 @@ class Translate:
     ) -> str:
         """Get localized string."""
 
-        if load_only == "":
-            load_only = self.load_only
-
         if language is None:
             language = await async_get_user_language()
 
-        await self.__async_check_language_loaded(
-            str(language), file_name=file_name, load_only=load_only
+        strings: dict[str, Any] = await self.async_get_strings(
+            str(language), file_name
         )
 
         if len(kvargs) == 0:
-            return Translate.__json_dict.get(key, default)
+            return strings.get(key, default)
 
-        return str(Translate.__json_dict.get(key, default)).format(**kvargs)
+        return str(strings.get(key, default)).format(**kvargs)
 
     # ------------------------------------------------------------------
-    async def __async_check_language_loaded(
-        self, language: str, file_name: str = ".json", load_only: str = ""
-    ) -> None:
-        """Check language."""
-
-        # ------------------------------------------------------------------
-        def recursive_flatten(
-            prefix: Any, data: dict[str, Any], load_only: str = ""
-        ) -> dict[str, Any]:
-            """Return a flattened representation of dict data."""
-            output = {}
-            for key, value in data.items():
-                if isinstance(value, dict):
-                    output.update(
-                        recursive_flatten(f"{prefix}{key}.", value, load_only)
-                    )
-                elif (
-                    load_only != "" and f"{prefix}{key}".find(load_only) == 0
-                ) or load_only == "":
-                    output[f"{prefix}{key}"] = value
-            return output
-
-        filename: Path = (
-            Path(Path(__file__).parent.parent) / "translations" / (language + file_name)
-        )
-
-        if not filename.is_file():
-            filename = (
-                Path(Path(__file__).parent.parent) / "translations" / ("en" + file_name)
-            )
-
-            if not filename.is_file():
-                return
-
-        if Translate.__filename != str(filename):
-            Translate.__filename = str(filename)
-            Translate.acive_language = language
-
-            async with aiofiles.open(str(filename)) as json_file:
-                Translate.__json_dict = recursive_flatten(
-                    "", orjson.loads(await json_file.read()), load_only
+    async def async_get_strings(
+        self, language: str, file_name: str = ".json"
+    ) -> dict[str, Any]:
+        """Flattened translations for language, loaded or checked when needed."""
+
+        cache_key: str = language + file_name
+
+        if (
+            translation_file := Translate.__cache.get(cache_key)
+        ) is not None and monotonic() - translation_file.checked < (
+            self.MTIME_CHECK_INTERVAL
+        ):
+            return translation_file.strings
+
+        async with Translate.__locks.setdefault(cache_key, Lock()):
+            translation_file = Translate.__cache.get(cache_key)
+
+            if (
+                translation_file is None
+                or monotonic() - translation_file.checked >= self.MTIME_CHECK_INTERVAL
+            ):
+                translation_file = await self.hass.async_add_executor_job(
+                    load_translation_file, language, file_name, translation_file
                 )
+                translation_file.checked = monotonic()
+                Translate.__cache[cache_key] = translation_file
+                Translate.acive_language = language
+
+        return translation_file.strings
@@ -0,0 +1,302 @@
+"""Repair issues.
+
+Issues have stable ids per helper and cause, so a failing helper updates
+its issue instead of adding new ones. An issue is written again at most once
+per ISSUE_RATE_LIMIT seconds, the latest change within the window is written
+when it ends. A missing source used by several helpers gets one issue listing
+all of them, and issues are deleted once the cause is gone.
+"""
+
+from asyncio import TimerHandle
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    DOMAIN_NAME,
+    TRANSLATION_KEY_MISSING_ENTITY,
+    TRANSLATION_KEY_TEMPLATE_ERROR,
+)
+from .state_dispatcher import async_get_state_dispatcher
+
+DATA_ISSUES: HassKey["IssueManager"] = HassKey(f"{DOMAIN}_issues")
+
+# Minimum seconds between writes of the same issue
+ISSUE_RATE_LIMIT = 60.0
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_ISSUES)
+def async_get_issues(hass: HomeAssistant) -> "IssueManager":
+    """Get the issue manager shared by all entries."""
+    return IssueManager(hass)
+
+
+# ------------------------------------------------------------------
+def template_issue_id(entry_id: str) -> str:
+    """Issue id of a template error of a helper."""
+    return f"{TRANSLATION_KEY_TEMPLATE_ERROR}_{entry_id}"
+
+
+# ------------------------------------------------------------------
+def missing_entity_issue_id(entity_id: str) -> str:
+    """Issue id of a missing source entity."""
+    return f"{TRANSLATION_KEY_MISSING_ENTITY}_{entity_id}"
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class IssueManager:
+    """Issue manager."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        # Issue id -> translation placeholders of the current issue
+        self._issues: dict[str, dict[str, str]] = {}
+        self._written: dict[str, float] = {}
+
+        # Issue id -> translation key and placeholders waiting for the window
+        self._pending: dict[str, tuple[str, dict[str, str]]] = {}
+        self._trailing: dict[str, TimerHandle] = {}
+
+        # Missing source entity id -> entry id -> helper entity id
+        self._missing: dict[str, dict[str, str]] = {}
+        self._dirty: set[str] = set()
+        self._scheduled: bool = False
+
+        self.created: int = 0
+        self.deleted: int = 0
+        self.suppressed: int = 0
+
+        self._async_load_issues()
+        async_get_state_dispatcher(hass).async_add_observer(self._async_state_changed)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_load_issues(self) -> None:
+        """Seed from the issue registry.
+
+        Issues with timestamp ids are from older versions. Missing source
+        issues are deleted, the startup verification creates them again.
+        """
+
+        issue_registry: ir.IssueRegistry = ir.async_get(self.hass)
+
+        for (domain, issue_id), issue in list(issue_registry.issues.items()):
+            if domain != DOMAIN:
+                continue
+
+            if issue_id.startswith(DOMAIN_NAME) or (
+                issue.translation_key == TRANSLATION_KEY_MISSING_ENTITY
+            ):
+                ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+                continue
+
+            self._issues[issue_id] = dict(issue.translation_placeholders or {})
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_create(
+        self,
+        issue_id: str,
+        translation_key: str,
+        translation_placeholders: dict[str, str],
+        rate_limit: bool = True,
+    ) -> None:
+        """Create or update an issue, unchanged issues are not written.
+
+        A rate limited change is kept and written when the window ends.
+        """
+
+        if self._issues.get(issue_id) == translation_placeholders:
+            self._async_cancel_pending(issue_id)
+            return
+
+        now: float = monotonic()
+        wait: float = self._written.get(issue_id, -ISSUE_RATE_LIMIT) + (
+            ISSUE_RATE_LIMIT - now
+        )
+
+        if rate_limit and wait > 0:
+            self.suppressed += 1
+            self._pending[issue_id] = (translation_key, translation_placeholders)
+
+            if issue_id not in self._trailing:
+                self._trailing[issue_id] = self.hass.loop.call_later(
+                    wait, self._async_write_pending, issue_id
+                )
+
+            return
+
+        self._async_cancel_pending(issue_id)
+
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            issue_id,
+            issue_domain=DOMAIN,
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key=translation_key,
+            translation_placeholders=translation_placeholders,
+        )
+        self._issues[issue_id] = translation_placeholders
+        self._written[issue_id] = now
+        self.created += 1
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_delete(self, issue_id: str) -> None:
+        """Delete an issue, if there is one."""
+
+        self._async_cancel_pending(issue_id)
+        self._written.pop(issue_id, None)
+
+        if self._issues.pop(issue_id, None) is None:
+            return
+
+        ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+        self.deleted += 1
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_write_pending(self, issue_id: str) -> None:
+        """Rate limit window ended, write the latest change."""
+
+        self._trailing.pop(issue_id, None)
+
+        if (pending := self._pending.pop(issue_id, None)) is not None:
+            self.async_create(issue_id, *pending)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_cancel_pending(self, issue_id: str) -> None:
+        """Drop a change waiting for the rate limit window."""
+
+        self._pending.pop(issue_id, None)
+
+        if (timer := self._trailing.pop(issue_id, None)) is not None:
+            timer.cancel()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_template_error(self, entry_id: str, template: str, error: str) -> None:
+        """Template of a helper failed to render."""
+
+        self.async_create(
+            template_issue_id(entry_id),
+            TRANSLATION_KEY_TEMPLATE_ERROR,
+            {"error_txt": error, "template": template},
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_template_ok(self, entry_id: str) -> None:
+        """Template of a helper rendered."""
+
+        if (issue_id := template_issue_id(entry_id)) in self._issues:
+            self.async_delete(issue_id)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_sources_verified(
+        self, entry_id: str, helper: str, entity_ids: list[str], missing: list[str]
+    ) -> None:
+        """Update missing source issues from a verification of a helper."""
+
+        for entity_id in entity_ids:
+            if entity_id in missing:
+                helpers: dict[str, str] = self._missing.setdefault(entity_id, {})
+
+                if helpers.get(entry_id) != helper:
+                    helpers[entry_id] = helper
+                    self._async_schedule(entity_id)
+            elif entity_id in self._missing:
+                self._async_found(entity_id)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_remove_helper(self, entry_id: str) -> None:
+        """Remove the issues of a removed helper."""
+
+        self.async_delete(template_issue_id(entry_id))
+
+        for entity_id, helpers in self._missing.items():
+            if helpers.pop(entry_id, None) is not None:
+                self._async_schedule(entity_id)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_schedule(self, entity_id: str) -> None:
+        """Write the missing source issue with the next loop iteration."""
+
+        self._dirty.add(entity_id)
+
+        if not self._scheduled:
+            self._scheduled = True
+            self.hass.loop.call_soon(self._async_flush)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_flush(self) -> None:
+        """Write missing source issues, one per source for all helpers."""
+
+        dirty: set[str] = self._dirty
+        self._dirty = set()
+        self._scheduled = False
+
+        for entity_id in dirty:
+            if not (helpers := self._missing.get(entity_id)):
+                self._async_found(entity_id)
+                continue
+
+            # Changes are already coalesced per loop iteration
+            self.async_create(
+                missing_entity_issue_id(entity_id),
+                TRANSLATION_KEY_MISSING_ENTITY,
+                {
+                    "entity": entity_id,
+                    "state_updated_helper": ", ".join(sorted(helpers.values())),
+                },
+                rate_limit=False,
+            )
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_found(self, entity_id: str) -> None:
+        """Source entity exists, delete its issue."""
+
+        self._missing.pop(entity_id, None)
+        self._dirty.discard(entity_id)
+        self.async_delete(missing_entity_issue_id(entity_id))
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_state_changed(
+        self, entity_id: str, new_state: State | None, old_state: State | None
+    ) -> None:
+        """Delete the issue of a missing source when it gets a state."""
+
+        if new_state is not None and entity_id in self._missing:
+            self._async_found(entity_id)
+
+    # ------------------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Issue statistics."""
+
+        return {
+            "issues": len(self._issues),
+            "missing_sources": len(self._missing),
+            "pending": len(self._pending),
+            "created": self.created,
+            "deleted": self.deleted,
+            "suppressed": self.suppressed,
+        }
@@ -0,0 +1,214 @@
+"""Metrics.
+
+Counters and latency histograms per State updated helper and in total.
+Collection is off by default and every call site checks
+MetricsRegistry.enabled first, so it costs one attribute lookup when off.
+"""
+
+from bisect import bisect_left
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_METRICS: HassKey["MetricsRegistry"] = HassKey(f"{DOMAIN}_metrics")
+
+# Upper bounds in milliseconds, the last bucket counts everything above
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+)
+
+# Every event is counted once as a trigger, unchanged or debounced, events
+# held by a debounce window are debounced until the window ends, then the last
+# one becomes a trigger or unchanged event
+COUNTERS: tuple[str, ...] = (
+    "events",
+    "unchanged",
+    "triggers",
+    "debounced",
+    "clears",
+)
+HISTOGRAMS: tuple[str, ...] = (
+    "template_render",
+    "runtime_state_update",
+    "event_to_write",
+)
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_METRICS)
+def async_get_metrics(hass: HomeAssistant) -> "MetricsRegistry":
+    """Get the metrics registry shared by all entries."""
+    return MetricsRegistry()
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class LatencyHistogram:
+    """Fixed bucket latency histogram."""
+
+    __slots__ = ("buckets", "count", "max", "total")
+
+    def __init__(self) -> None:
+        """Init."""
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    # ------------------------------------------------------------------
+    def observe(self, seconds: float) -> None:
+        """Record a duration."""
+
+        milliseconds: float = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+        if milliseconds > self.max:
+            self.max = milliseconds
+
+    # ------------------------------------------------------------------
+    def as_dict(self) -> dict[str, Any]:
+        """Histogram as dict, durations in milliseconds."""
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 4) if self.count else 0.0,
+            "max_ms": round(self.max, 4),
+            "buckets_ms": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(
+                        LATENCY_BUCKETS_MS, self.buckets, strict=False
+                    )
+                },
+                "inf": self.buckets[-1],
+            },
+        }
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class HelperMetrics:
+    """Metrics for one helper, also added to the total."""
+
+    __slots__ = (*COUNTERS, *HISTOGRAMS, "total")
+
+    def __init__(self, total: "HelperMetrics | None" = None) -> None:
+        """Init."""
+        self.total: HelperMetrics | None = total
+        self.reset()
+
+    # ------------------------------------------------------------------
+    def reset(self) -> None:
+        """Reset counters and histograms."""
+
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+        for name in HISTOGRAMS:
+            setattr(self, name, LatencyHistogram())
+
+    # ------------------------------------------------------------------
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increment counter."""
+
+        setattr(self, name, getattr(self, name) + amount)
+
+        if self.total is not None:
+            self.total.increment(name, amount)
+
+    # ------------------------------------------------------------------
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in histogram."""
+
+        getattr(self, name).observe(seconds)
+
+        if self.total is not None:
+            self.total.observe(name, seconds)
+
+    # ------------------------------------------------------------------
+    def as_dict(self) -> dict[str, Any]:
+        """Metrics as dict."""
+
+        return {
+            **{name: getattr(self, name) for name in COUNTERS},
+            **{name: getattr(self, name).as_dict() for name in HISTOGRAMS},
+        }
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class MetricsRegistry:
+    """Metrics registry."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.enabled: bool = False
+        self.total: HelperMetrics = HelperMetrics()
+        self.helpers: dict[str, HelperMetrics] = {}
+
+        # Setup is always measured, it is one measurement per entry
+        self.setup: LatencyHistogram = LatencyHistogram()
+        self.setup_seconds: dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_get_helper(self, key: str) -> HelperMetrics:
+        """Get or create metrics for a helper."""
+
+        if (metrics := self.helpers.get(key)) is None:
+            metrics = self.helpers[key] = HelperMetrics(self.total)
+
+        return metrics
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_remove_helper(self, key: str) -> None:
+        """Remove metrics for a helper, the total is kept."""
+        self.helpers.pop(key, None)
+        self.setup_seconds.pop(key, None)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_observe_setup(self, key: str, seconds: float) -> None:
+        """Record the setup time of a helper."""
+
+        self.setup.observe(seconds)
+        self.setup_seconds[key] = seconds
+
+    # ------------------------------------------------------------------
+    def setup_as_dict(self) -> dict[str, Any]:
+        """Setup times as dict, durations in milliseconds."""
+
+        return {
+            **self.setup.as_dict(),
+            "helpers": len(self.setup_seconds),
+            "total_ms": round(sum(self.setup_seconds.values()) * 1000, 4),
+        }
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_reset(self) -> None:
+        """Reset all metrics."""
+
+        self.total.reset()
+
+        for metrics in self.helpers.values():
+            metrics.reset()
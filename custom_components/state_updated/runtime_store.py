@@ -0,0 +1,236 @@
+"""Runtime state store.
+
+Holds new_value, old_value, updated and last_updated for all State updated
+helpers in one storage file, so config entry options only hold user
+configuration. Changes are merged into one delayed write and writes are
+capped to one per min_write_interval. Both can be changed at runtime with
+async_set_write_rate and are kept in the store file.
+"""
+
+from asyncio import Lock
+from collections.abc import Callable
+from time import monotonic, perf_counter
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    ATTR_MIN_WRITE_INTERVAL,
+    ATTR_WRITE_DELAY,
+    DEFAULT_STORE_MIN_WRITE_INTERVAL,
+    DEFAULT_STORE_WRITE_DELAY,
+    DOMAIN,
+    LOGGER,
+)
+
+DATA_RUNTIME_STORE: HassKey["RuntimeStore"] = HassKey(f"{DOMAIN}_runtime_store")
+
+STORAGE_KEY = f"{DOMAIN}.runtime_state"
+STORAGE_VERSION = 1
+
+# Reserved key of the write rate settings in the store file
+SETTINGS_KEY = "_settings"
+
+RuntimeRecord = dict[str, Any] | Callable[[], dict[str, Any]]
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_RUNTIME_STORE)
+def async_get_runtime_store(hass: HomeAssistant) -> "RuntimeStore":
+    """Get the runtime store shared by all entries."""
+    return RuntimeStore(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class RuntimeStore:
+    """Runtime state store.
+
+    Records are replaced, never mutated, so a shallow copy of the record dict
+    is safe to hand to the executor for serialization. A record which is
+    expensive to build on every change can be set as a callable, it is
+    called when the record is read or written.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        write_delay: float = DEFAULT_STORE_WRITE_DELAY,
+        min_write_interval: float = DEFAULT_STORE_MIN_WRITE_INTERVAL,
+    ) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+        self.write_delay: float = write_delay
+        self.min_write_interval: float = min_write_interval
+
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._records: dict[str, RuntimeRecord] = {}
+        self._loaded: bool = False
+        self._load_lock: Lock = Lock()
+
+        self._custom_settings: bool = False
+        self._dirty: bool = False
+        self._unsub_write: CALLBACK_TYPE | None = None
+        self._last_write: float | None = None
+
+        self.changes: int = 0
+        self.writes: int = 0
+        self.write_seconds: float = 0.0
+        self.write_seconds_max: float = 0.0
+
+    # ------------------------------------------------------------------
+    async def async_load(self) -> None:
+        """Load records once."""
+
+        if self._loaded:
+            return
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            self._records = await self._store.async_load() or {}
+
+            if (settings := self._records.pop(SETTINGS_KEY, None)) is not None:
+                self.write_delay = settings.get(ATTR_WRITE_DELAY, self.write_delay)
+                self.min_write_interval = settings.get(
+                    ATTR_MIN_WRITE_INTERVAL, self.min_write_interval
+                )
+                self._custom_settings = True
+
+            self._loaded = True
+
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
+
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get record."""
+
+        if callable(record := self._records.get(key)):
+            return record()
+
+        return record
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_set(self, key: str, record: RuntimeRecord) -> None:
+        """Set record and schedule a write."""
+
+        self._records[key] = record
+        self.async_schedule_write()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_remove(self, key: str) -> None:
+        """Remove record and schedule a write."""
+
+        if self._records.pop(key, None) is not None:
+            self.async_schedule_write()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_set_write_rate(
+        self, write_delay: float | None = None, min_write_interval: float | None = None
+    ) -> None:
+        """Set the write delay and minimum write interval, kept in the store."""
+
+        if write_delay is not None:
+            self.write_delay = write_delay
+
+        if min_write_interval is not None:
+            self.min_write_interval = min_write_interval
+
+        self._custom_settings = True
+        self.async_schedule_write()
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_schedule_write(self) -> None:
+        """Mark dirty and arm a delayed write, unless one is already armed."""
+
+        self.changes += 1
+        self._dirty = True
+
+        if self._unsub_write is not None:
+            return
+
+        delay: float = self.write_delay
+
+        if self._last_write is not None:
+            delay = max(
+                delay, self._last_write + self.min_write_interval - monotonic()
+            )
+
+        self._unsub_write = async_call_later(self.hass, delay, self._async_write_later)
+
+    # ------------------------------------------------------------------
+    async def _async_write_later(self, _now: Any) -> None:
+        """Delayed write."""
+
+        self._unsub_write = None
+        await self.async_flush()
+
+    # ------------------------------------------------------------------
+    async def _async_final_write(self, _event: Event) -> None:
+        """Flush on final write."""
+        await self.async_flush()
+
+    # ------------------------------------------------------------------
+    async def async_flush(self) -> None:
+        """Write pending changes now."""
+
+        if self._unsub_write is not None:
+            self._unsub_write()
+            self._unsub_write = None
+
+        if not self._dirty:
+            return
+
+        self._dirty = False
+        self._last_write = monotonic()
+        self.writes += 1
+
+        LOGGER.debug(
+            "Writing runtime state, %s changes in %s writes", self.changes, self.writes
+        )
+        start: float = perf_counter()
+        data: dict[str, dict[str, Any]] = {
+            key: record() if callable(record) else record
+            for key, record in self._records.items()
+        }
+
+        if self._custom_settings:
+            data[SETTINGS_KEY] = {
+                ATTR_WRITE_DELAY: self.write_delay,
+                ATTR_MIN_WRITE_INTERVAL: self.min_write_interval,
+            }
+
+        await self._store.async_save(data)
+        duration: float = perf_counter() - start
+        self.write_seconds += duration
+        self.write_seconds_max = max(self.write_seconds_max, duration)
+
+    # ------------------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Store statistics."""
+
+        return {
+            "records": len(self._records),
+            ATTR_WRITE_DELAY: self.write_delay,
+            ATTR_MIN_WRITE_INTERVAL: self.min_write_interval,
+            "changes": self.changes,
+            "writes": self.writes,
+            "write_seconds": round(self.write_seconds, 4),
+            "write_ms_max": round(self.write_seconds_max * 1000, 3),
+            "dirty": self._dirty,
+        }
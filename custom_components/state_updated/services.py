@@ -0,0 +1,218 @@
+"""Services for State updated integration."""
+
+from time import perf_counter
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    ATTR_FLOOR_ID,
+    ATTR_LABEL_ID,
+)
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .component_api import ComponentApi
+from .const import (
+    ATTR_ENABLED,
+    ATTR_MIN_WRITE_INTERVAL,
+    ATTR_ONLY_UPDATED,
+    ATTR_RESET,
+    ATTR_WRITE_DELAY,
+    DOMAIN,
+    LOGGER,
+    SERVICE_GET_METRICS,
+    SERVICE_RESET_ALL,
+    SERVICE_SET_METRICS,
+    SERVICE_SET_STORE_OPTIONS,
+)
+from .expiry_scheduler import async_get_expiry_scheduler
+from .issues import async_get_issues
+from .metrics import async_get_metrics
+from .runtime_store import async_get_runtime_store
+from .source_index import async_get_source_index
+from .source_metadata import async_get_source_metadata
+from .source_verifier import async_get_source_verifier
+from .state_dispatcher import async_get_state_dispatcher
+from .template_cache import async_get_template_cache
+
+RESET_ALL_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_ONLY_UPDATED, default=False): cv.boolean,
+    }
+)
+
+SET_METRICS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENABLED): cv.boolean,
+        vol.Optional(ATTR_RESET, default=False): cv.boolean,
+    }
+)
+
+SET_STORE_OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_WRITE_DELAY): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=300)
+        ),
+        vol.Optional(ATTR_MIN_WRITE_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=3600)
+        ),
+    }
+)
+
+TARGET_KEYS: tuple[str, ...] = (
+    ATTR_ENTITY_ID,
+    ATTR_DEVICE_ID,
+    ATTR_AREA_ID,
+    ATTR_FLOOR_ID,
+    ATTR_LABEL_ID,
+)
+
+
+# ------------------------------------------------------------------
+@callback
+def async_get_component_apis(hass: HomeAssistant) -> list[ComponentApi]:
+    """Get component api for all loaded entries."""
+
+    return [
+        entry.runtime_data.component_api
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+# ------------------------------------------------------------------
+@callback
+def async_get_shared_stats(hass: HomeAssistant) -> dict[str, Any]:
+    """Statistics of the objects shared by all entries."""
+
+    return {
+        "template_cache": async_get_template_cache(hass).stats(),
+        "runtime_store": async_get_runtime_store(hass).stats(),
+        "expiry_scheduler": {"pending": len(async_get_expiry_scheduler(hass))},
+        "state_dispatcher": {"watched": len(async_get_state_dispatcher(hass))},
+        "source_index": {"matchers": len(async_get_source_index(hass))},
+        "source_metadata": {"entities": len(async_get_source_metadata(hass))},
+        "source_verifier": async_get_source_verifier(hass).stats(),
+        "issues": async_get_issues(hass).stats(),
+    }
+
+
+# ------------------------------------------------------------------
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up services."""
+
+    # ------------------------------------------------------------------
+    async def async_reset_all_service(call: ServiceCall) -> ServiceResponse:
+        """Reset all, or the targeted, State updated helpers in one batch."""
+
+        start: float = perf_counter()
+        component_apis: list[ComponentApi] = async_get_component_apis(hass)
+
+        if any(key in call.data for key in TARGET_KEYS):
+            selected = async_extract_referenced_entity_ids(hass, call)
+            entity_ids: set[str] = selected.referenced | selected.indirectly_referenced
+            component_apis = [
+                component_api
+                for component_api in component_apis
+                if component_api.entity_id in entity_ids
+            ]
+
+        if call.data[ATTR_ONLY_UPDATED]:
+            component_apis = [
+                component_api
+                for component_api in component_apis
+                if component_api.updated
+            ]
+
+        # Clear everything in memory first, the runtime store merges the
+        # records into one write. Then write all states in one pass.
+        for component_api in component_apis:
+            component_api.async_clear(update_listeners=False)
+
+        for component_api in component_apis:
+            component_api.async_update_listeners()
+
+        duration_ms: float = round((perf_counter() - start) * 1000, 3)
+        LOGGER.debug(
+            "Reset %s State updated helpers in %s ms", len(component_apis), duration_ms
+        )
+
+        return {"reset": len(component_apis), "duration_ms": duration_ms}
+
+    # ------------------------------------------------------------------
+    async def async_get_metrics_service(call: ServiceCall) -> ServiceResponse:
+        """Get metrics, per helper and in total."""
+
+        metrics = async_get_metrics(hass)
+
+        return {
+            ATTR_ENABLED: metrics.enabled,
+            "total": metrics.total.as_dict(),
+            "setup": metrics.setup_as_dict(),
+            "helpers": {
+                component_api.entity_id
+                or component_api.entry.entry_id: component_api.metrics.as_dict()
+                for component_api in async_get_component_apis(hass)
+            },
+            **async_get_shared_stats(hass),
+        }
+
+    # ------------------------------------------------------------------
+    async def async_set_metrics_service(call: ServiceCall) -> None:
+        """Switch metrics collection on or off."""
+
+        metrics = async_get_metrics(hass)
+        metrics.enabled = call.data[ATTR_ENABLED]
+
+        if call.data[ATTR_RESET]:
+            metrics.async_reset()
+
+    # ------------------------------------------------------------------
+    async def async_set_store_options_service(call: ServiceCall) -> None:
+        """Set the write rate of the runtime store."""
+
+        runtime_store = async_get_runtime_store(hass)
+        await runtime_store.async_load()
+        runtime_store.async_set_write_rate(
+            call.data.get(ATTR_WRITE_DELAY), call.data.get(ATTR_MIN_WRITE_INTERVAL)
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESET_ALL,
+        async_reset_all_service,
+        schema=RESET_ALL_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_METRICS,
+        async_get_metrics_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_METRICS,
+        async_set_metrics_service,
+        schema=SET_METRICS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_STORE_OPTIONS,
+        async_set_store_options_service,
+        schema=SET_STORE_OPTIONS_SCHEMA,
+    )
@@ -0,0 +1,469 @@
+"""Source index.
+
+Keeps the set of entities matching a source pattern up to date for State
+updated helpers defined by entity id pattern, area or label. Matchers are
+compiled once, the registries are scanned once per matcher key and the
+matched set is kept across reloads. Afterwards only entities named in entity
+and device registry updated events, and entities outside the entity registry
+getting or losing a state, watched by a helper or not, are matched again. An
+entity losing its state briefly, like on a reload, is matched again when it
+gets it back.
+"""
+
+from collections.abc import Callable, Iterable
+from enum import StrEnum
+from fnmatch import translate
+from itertools import count
+import re
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.event import EventStateChangedData
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    CONF_ENTITY_PATTERN,
+    CONF_PATTERN_TYPE,
+    CONF_SOURCE_AREA,
+    CONF_SOURCE_LABEL,
+    DOMAIN,
+)
+
+DATA_SOURCE_INDEX: HassKey["SourceIndex"] = HassKey(f"{DOMAIN}_source_index")
+
+SourcesChangedCallback = Callable[[list[str], list[str]], None]
+
+# Entity id pattern, area id and label id
+MatcherKey = tuple[str, str | None, str | None]
+
+# Entity id, if the entity exists, its registry entry and device entry
+Lookup = tuple[str, bool, er.RegistryEntry | None, dr.DeviceEntry | None]
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class PatternType(StrEnum):
+    """Entity id pattern type."""
+
+    GLOB = "glob"
+    REGEX = "regex"
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_SOURCE_INDEX)
+def async_get_source_index(hass: HomeAssistant) -> "SourceIndex":
+    """Get the source index shared by all entries."""
+    return SourceIndex(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceMatcher:
+    """Compiled source pattern.
+
+    Entity id pattern, area and label must all match when given. Area and
+    label of the device are used as well, like targets in actions.
+    """
+
+    __slots__ = ("area_id", "key", "label_id", "pattern", "regex")
+
+    def __init__(
+        self,
+        pattern: str = "",
+        pattern_type: PatternType = PatternType.GLOB,
+        area_id: str | None = None,
+        label_id: str | None = None,
+    ) -> None:
+        """Init."""
+        self.pattern: str = pattern
+        self.regex: re.Pattern[str] | None = None
+        self.area_id: str | None = area_id or None
+        self.label_id: str | None = label_id or None
+
+        if pattern:
+            self.regex = re.compile(
+                pattern if pattern_type is PatternType.REGEX else translate(pattern)
+            )
+
+        self.key: MatcherKey = (
+            self.regex.pattern if self.regex is not None else "",
+            self.area_id,
+            self.label_id,
+        )
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> "SourceMatcher | None":
+        """Matcher from config entry options, None if no pattern is defined.
+
+        Raises re.error if the pattern is invalid.
+        """
+
+        if not (
+            options.get(CONF_ENTITY_PATTERN)
+            or options.get(CONF_SOURCE_AREA)
+            or options.get(CONF_SOURCE_LABEL)
+        ):
+            return None
+
+        return cls(
+            options.get(CONF_ENTITY_PATTERN, "").strip(),
+            PatternType(options.get(CONF_PATTERN_TYPE, PatternType.GLOB)),
+            options.get(CONF_SOURCE_AREA),
+            options.get(CONF_SOURCE_LABEL),
+        )
+
+    # ------------------------------------------------------------------
+    @property
+    def registry_only(self) -> bool:
+        """Only entities in the entity registry can match."""
+        return self.area_id is not None or self.label_id is not None
+
+    # ------------------------------------------------------------------
+    def matches(
+        self,
+        entity_id: str,
+        entity_entry: er.RegistryEntry | None,
+        device_entry: dr.DeviceEntry | None,
+    ) -> bool:
+        """Return True if the entity matches."""
+
+        if self.regex is not None and self.regex.fullmatch(entity_id) is None:
+            return False
+
+        if entity_entry is None:
+            return not self.registry_only
+
+        if entity_entry.disabled_by is not None:
+            return False
+
+        if self.area_id is not None and self.area_id != (
+            entity_entry.area_id
+            or (device_entry.area_id if device_entry is not None else None)
+        ):
+            return False
+
+        return self.label_id is None or (
+            self.label_id in entity_entry.labels
+            or (device_entry is not None and self.label_id in device_entry.labels)
+        )
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class _Registration:
+    """Matcher, matched entities and change callback of one helper."""
+
+    __slots__ = ("matched", "matcher", "sources_changed")
+
+    def __init__(
+        self,
+        matcher: SourceMatcher,
+        matched: set[str],
+        sources_changed: SourcesChangedCallback,
+    ) -> None:
+        """Init."""
+        self.matcher: SourceMatcher = matcher
+        self.matched: set[str] = matched
+        self.sources_changed: SourcesChangedCallback = sources_changed
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceIndex:
+    """Source index.
+
+    Listeners are added when the first matcher is matched and kept, so the
+    matched sets stay current while helpers are reloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._registrations: dict[int, _Registration] = {}
+        self._tokens = count()
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+        # Matcher key -> matcher and the entities matching now
+        self._matchers: dict[MatcherKey, SourceMatcher] = {}
+        self._matched: dict[MatcherKey, set[str]] = {}
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of registered matchers."""
+        return len(self._registrations)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_match(self, matcher: SourceMatcher) -> list[str]:
+        """Entities matching now, the candidates are scanned once per matcher key."""
+
+        if (matched := self._matched.get(matcher.key)) is None:
+            self._async_listen()
+            matched = self._matched[matcher.key] = set(self._async_scan(matcher))
+            self._matchers[matcher.key] = matcher
+
+        return sorted(matched)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_scan(self, matcher: SourceMatcher) -> list[str]:
+        """Entities matching now, one scan of the candidates of the matcher."""
+
+        entity_registry = er.async_get(self.hass)
+        device_registry = dr.async_get(self.hass)
+        candidates: Iterable[er.RegistryEntry]
+
+        if matcher.label_id is not None:
+            candidates = self._entries_for_label(matcher.label_id)
+        elif matcher.area_id is not None:
+            candidates = self._entries_for_area(matcher.area_id)
+        else:
+            candidates = entity_registry.entities.values()
+
+        matched: list[str] = [
+            entity_entry.entity_id
+            for entity_entry in candidates
+            if matcher.matches(
+                entity_entry.entity_id,
+                entity_entry,
+                device_registry.async_get(entity_entry.device_id)
+                if entity_entry.device_id is not None
+                else None,
+            )
+        ]
+
+        if not matcher.registry_only:
+            matched.extend(
+                entity_id
+                for entity_id in self.hass.states.async_entity_ids()
+                if entity_id not in entity_registry.entities
+                and matcher.matches(entity_id, None, None)
+            )
+
+        return matched
+
+    # ------------------------------------------------------------------
+    def _entries_for_label(self, label_id: str) -> list[er.RegistryEntry]:
+        """Entities with the label on the entity or on its device."""
+
+        entity_registry = er.async_get(self.hass)
+        entries: dict[str, er.RegistryEntry] = {
+            entity_entry.entity_id: entity_entry
+            for entity_entry in er.async_entries_for_label(entity_registry, label_id)
+        }
+
+        for device_entry in dr.async_entries_for_label(
+            dr.async_get(self.hass), label_id
+        ):
+            for entity_entry in er.async_entries_for_device(
+                entity_registry, device_entry.id
+            ):
+                entries.setdefault(entity_entry.entity_id, entity_entry)
+
+        return list(entries.values())
+
+    # ------------------------------------------------------------------
+    def _entries_for_area(self, area_id: str) -> list[er.RegistryEntry]:
+        """Entities in the area, directly or through their device."""
+
+        entity_registry = er.async_get(self.hass)
+        entries: dict[str, er.RegistryEntry] = {
+            entity_entry.entity_id: entity_entry
+            for entity_entry in er.async_entries_for_area(entity_registry, area_id)
+        }
+
+        for device_entry in dr.async_entries_for_area(
+            dr.async_get(self.hass), area_id
+        ):
+            for entity_entry in er.async_entries_for_device(
+                entity_registry, device_entry.id
+            ):
+                entries.setdefault(entity_entry.entity_id, entity_entry)
+
+        return list(entries.values())
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_register(
+        self,
+        matcher: SourceMatcher,
+        matched: Iterable[str],
+        sources_changed: SourcesChangedCallback,
+    ) -> CALLBACK_TYPE:
+        """Register matcher with the currently matched entities.
+
+        sources_changed is called with the entities entering and leaving the
+        matched set.
+        """
+
+        if matcher.key not in self._matched:
+            self.async_match(matcher)
+
+        token: int = next(self._tokens)
+        self._registrations[token] = _Registration(
+            matcher, set(matched), sources_changed
+        )
+
+        @callback
+        def unregister() -> None:
+            """Unregister."""
+            self._registrations.pop(token, None)
+
+        return unregister
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_listen(self) -> None:
+        """Listen to the registries and to states added or removed.
+
+        States are not listened to through the state dispatcher, it only sees
+        entities a helper is subscribed to already.
+        """
+
+        if self._unsubs:
+            return
+
+        self._unsubs = [
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_entity_registry_updated,
+            ),
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                self._async_device_registry_updated,
+            ),
+            self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_state_changed,
+                event_filter=self._async_state_added_or_removed,
+            ),
+        ]
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_entity_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Match the created, removed or updated entity again."""
+
+        entity_ids: list[str] = [event.data["entity_id"]]
+
+        if old_entity_id := event.data.get("old_entity_id"):
+            entity_ids.append(old_entity_id)
+
+        self._async_update(entity_ids)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_device_registry_updated(
+        self, event: Event[dr.EventDeviceRegistryUpdatedData]
+    ) -> None:
+        """Match the entities of a device again when its area or labels changed."""
+
+        if event.data["action"] != "update" or not (
+            {"area_id", "labels"} & event.data.get("changes", {}).keys()
+        ):
+            return
+
+        self._async_update(
+            [
+                entity_entry.entity_id
+                for entity_entry in er.async_entries_for_device(
+                    er.async_get(self.hass), event.data["device_id"]
+                )
+            ]
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_state_added_or_removed(self, event_data: EventStateChangedData) -> bool:
+        """Only states added or removed can change the matched sets."""
+        return (event_data["new_state"] is None) != (event_data["old_state"] is None)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Match an entity outside the entity registry getting or losing a state."""
+
+        entity_id: str = event.data["entity_id"]
+
+        if entity_id in er.async_get(self.hass).entities:
+            return
+
+        self._async_apply(
+            [(entity_id, event.data["new_state"] is not None, None, None)]
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_update(self, entity_ids: list[str]) -> None:
+        """Match entities against every matcher and report entering and leaving."""
+
+        entity_registry = er.async_get(self.hass)
+        device_registry = dr.async_get(self.hass)
+        lookups: list[Lookup] = []
+
+        for entity_id in entity_ids:
+            entity_entry: er.RegistryEntry | None = entity_registry.async_get(
+                entity_id
+            )
+            device_entry: dr.DeviceEntry | None = None
+
+            if entity_entry is not None and entity_entry.device_id is not None:
+                device_entry = device_registry.async_get(entity_entry.device_id)
+
+            # Removed from the registry, the entity is gone
+            lookups.append(
+                (entity_id, entity_entry is not None, entity_entry, device_entry)
+            )
+
+        self._async_apply(lookups)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_apply(self, lookups: list[Lookup]) -> None:
+        """Match looked up entities once per matcher key.
+
+        The matched sets are updated and registrations are told about the
+        entities entering and leaving.
+        """
+
+        results: dict[MatcherKey, list[tuple[str, bool]]] = {}
+
+        for key, matcher in self._matchers.items():
+            matched: set[str] = self._matched[key]
+            result: list[tuple[str, bool]] = [
+                (
+                    entity_id,
+                    exists and matcher.matches(entity_id, entity_entry, device_entry),
+                )
+                for entity_id, exists, entity_entry, device_entry in lookups
+            ]
+            results[key] = result
+
+            for entity_id, matches in result:
+                if matches:
+                    matched.add(entity_id)
+                else:
+                    matched.discard(entity_id)
+
+        for registration in list(self._registrations.values()):
+            added: list[str] = []
+            removed: list[str] = []
+
+            for entity_id, matches in results[registration.matcher.key]:
+                if matches and entity_id not in registration.matched:
+                    registration.matched.add(entity_id)
+                    added.append(entity_id)
+                elif not matches and entity_id in registration.matched:
+                    registration.matched.discard(entity_id)
+                    removed.append(entity_id)
+
+            if added or removed:
+                registration.sources_changed(added, removed)
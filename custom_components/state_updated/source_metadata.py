@@ -0,0 +1,201 @@
+"""Source metadata cache.
+
+Unit of measurement and icon of source entities and the icon table of each
+platform, shared by all State updated helpers. Units follow the unit
+attribute of dispatched state changes, and entity registry updates drop the
+metadata of the updated entity.
+"""
+
+from asyncio import Lock
+from typing import Any
+
+from homeassistant.const import ATTR_ICON, ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er, icon as ic
+from homeassistant.helpers.entity import get_unit_of_measurement
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .state_dispatcher import async_get_state_dispatcher
+
+DATA_SOURCE_METADATA: HassKey["SourceMetadataCache"] = HassKey(
+    f"{DOMAIN}_source_metadata"
+)
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_SOURCE_METADATA)
+def async_get_source_metadata(hass: HomeAssistant) -> "SourceMetadataCache":
+    """Get the source metadata cache shared by all entries."""
+    return SourceMetadataCache(hass)
+
+
+# ------------------------------------------------------------------
+def format_uom(unit: str | None) -> str:
+    """Unit as appended to values, percent without a space."""
+
+    if unit is None:
+        return ""
+
+    if unit == "%":
+        return unit
+
+    return " " + unit
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceMetadata:
+    """Metadata of one source entity."""
+
+    __slots__ = ("icon", "icon_resolved", "unit", "uom")
+
+    def __init__(self, unit: str | None) -> None:
+        """Init."""
+        self.unit: str | None = unit
+        self.uom: str = format_uom(unit)
+        self.icon: str | None = None
+        self.icon_resolved: bool = False
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceMetadataCache:
+    """Source metadata cache."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._metadata: dict[str, SourceMetadata] = {}
+        self._platform_icons: dict[str, dict[str, Any]] = {}
+        self._platform_locks: dict[str, Lock] = {}
+
+        async_get_state_dispatcher(hass).async_add_observer(self._async_state_changed)
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+        )
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of cached source entities."""
+        return len(self._metadata)
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_get(self, entity_id: str) -> SourceMetadata:
+        """Get metadata, the unit is looked up on a miss."""
+
+        if (metadata := self._metadata.get(entity_id)) is None:
+            try:
+                unit: str | None = get_unit_of_measurement(self.hass, entity_id)
+            except HomeAssistantError:
+                unit = None
+
+            metadata = self._metadata[entity_id] = SourceMetadata(unit)
+
+        return metadata
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_get_uom(self, entity_id: str) -> str:
+        """Unit of measurement as appended to values."""
+
+        if not entity_id:
+            return ""
+
+        return self._async_get(entity_id).uom
+
+    # ------------------------------------------------------------------
+    async def async_get_icon(self, entity_id: str) -> str | None:
+        """Icon from the state, the entity registry or the platform icons."""
+
+        metadata: SourceMetadata = self._async_get(entity_id)
+
+        if not metadata.icon_resolved:
+            metadata.icon = await self._async_resolve_icon(entity_id)
+            metadata.icon_resolved = True
+
+        return metadata.icon
+
+    # ------------------------------------------------------------------
+    async def _async_resolve_icon(self, entity_id: str) -> str | None:
+        """Resolve icon."""
+
+        if (state := self.hass.states.get(entity_id)) is not None and (
+            icon := state.attributes.get(ATTR_ICON)
+        ) is not None:
+            return icon
+
+        if (source_entity := er.async_get(self.hass).async_get(entity_id)) is None:
+            return None
+
+        if source_entity.icon is not None:
+            return source_entity.icon
+
+        icons: dict[str, Any] = await self._async_get_platform_icons(
+            source_entity.platform
+        )
+
+        return (
+            icons.get(source_entity.domain, {})
+            .get(source_entity.translation_key, {})
+            .get("default")
+        )
+
+    # ------------------------------------------------------------------
+    async def _async_get_platform_icons(self, platform: str) -> dict[str, Any]:
+        """Entity icon table of a platform, loaded once per platform."""
+
+        if (icons := self._platform_icons.get(platform)) is not None:
+            return icons
+
+        async with self._platform_locks.setdefault(platform, Lock()):
+            if (icons := self._platform_icons.get(platform)) is None:
+                icons = await ic.async_get_icons(
+                    self.hass, "entity", integrations=[platform]
+                )
+                icons = self._platform_icons[platform] = icons.get(platform) or {}
+
+        return icons
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_state_changed(
+        self, entity_id: str, new_state: State | None, old_state: State | None
+    ) -> None:
+        """Follow unit and icon attribute changes of cached entities."""
+
+        if (metadata := self._metadata.get(entity_id)) is None or new_state is None:
+            return
+
+        if (unit := new_state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)) != (
+            metadata.unit
+        ):
+            metadata.unit = unit
+            metadata.uom = format_uom(unit)
+
+        if (
+            metadata.icon_resolved
+            and (icon := new_state.attributes.get(ATTR_ICON)) is not None
+            and icon != metadata.icon
+        ):
+            metadata.icon = icon
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_entity_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Drop metadata of the updated, renamed or removed entity."""
+
+        if event.data["action"] == "create":
+            return
+
+        self._metadata.pop(event.data["entity_id"], None)
+
+        if old_entity_id := event.data.get("old_entity_id"):
+            self._metadata.pop(old_entity_id, None)
@@ -0,0 +1,167 @@
+"""Source table.
+
+Per source old value, new value and last updated for State updated helpers
+watching more than one entity.
+"""
+
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+from .change_filter import ChangeFilter, NumericMode
+
+ATTR_CHANGED_SOURCES = "changed_sources"
+ATTR_SOURCE_ENTITY_ID = "source_entity_id"
+ATTR_SOURCES = "sources"
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceState:
+    """State of one source."""
+
+    __slots__ = ("change_filter", "last_updated", "new_value", "old_value")
+
+    def __init__(self, value: Any, change_filter: ChangeFilter | None) -> None:
+        """Init."""
+        self.new_value: Any = value
+        self.old_value: Any = value
+        self.last_updated: float = 0.0
+        self.change_filter: ChangeFilter | None = change_filter
+
+    # ------------------------------------------------------------------
+    def is_change(self, new_value: Any, old_value: Any) -> bool:
+        """Return True if new value is a change compared to old value."""
+
+        if self.change_filter is None:
+            return new_value != old_value
+
+        return self.change_filter.is_change(new_value, old_value)
+
+    # ------------------------------------------------------------------
+    def set(self, new_value: Any, old_value: Any, when: datetime) -> None:
+        """Set values."""
+
+        self.new_value = new_value
+        self.old_value = old_value
+        self.last_updated = when.timestamp()
+
+        if self.change_filter is not None:
+            self.change_filter.reported(new_value)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceTable:
+    """Source table.
+
+    One slotted SourceState per source. A change filter per source is only
+    created when a numeric mode is used, plain inequality needs no state.
+    Sources changed since the last clear are kept in insertion order.
+    """
+
+    __slots__ = ("_sources", "changed", "mode", "threshold")
+
+    def __init__(
+        self,
+        mode: NumericMode = NumericMode.OFF,
+        threshold: float = 0.0,
+    ) -> None:
+        """Init."""
+        self.mode: NumericMode = mode
+        self.threshold: float = threshold
+
+        self._sources: dict[str, SourceState] = {}
+        self.changed: dict[str, None] = {}
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of sources."""
+        return len(self._sources)
+
+    # ------------------------------------------------------------------
+    def __contains__(self, entity_id: str) -> bool:
+        """Source exists."""
+        return entity_id in self._sources
+
+    # ------------------------------------------------------------------
+    def __iter__(self) -> Iterator[str]:
+        """Iterate source entity ids."""
+        return iter(self._sources)
+
+    # ------------------------------------------------------------------
+    def get(self, entity_id: str) -> SourceState | None:
+        """Get source."""
+        return self._sources.get(entity_id)
+
+    # ------------------------------------------------------------------
+    def add(self, entity_id: str, value: Any = "") -> SourceState:
+        """Add source, an existing source is kept."""
+
+        if (source := self._sources.get(entity_id)) is None:
+            source = self._sources[entity_id] = SourceState(
+                value,
+                None
+                if self.mode is NumericMode.OFF
+                else ChangeFilter(self.mode, self.threshold, value),
+            )
+
+        return source
+
+    # ------------------------------------------------------------------
+    def remove(self, entity_id: str) -> None:
+        """Remove source."""
+
+        self._sources.pop(entity_id, None)
+        self.changed.pop(entity_id, None)
+
+    # ------------------------------------------------------------------
+    def mark_changed(self, entity_id: str) -> None:
+        """Mark source as changed since the last clear."""
+        self.changed[entity_id] = None
+
+    # ------------------------------------------------------------------
+    def clear_changed(self) -> None:
+        """Forget which sources changed."""
+        self.changed.clear()
+
+    # ------------------------------------------------------------------
+    def changed_sources(self) -> list[str]:
+        """Sources changed since the last clear, oldest first."""
+        return list(self.changed)
+
+    # ------------------------------------------------------------------
+    def as_dict(self) -> dict[str, list[Any]]:
+        """Table as dict of [new value, old value, last updated]."""
+
+        return {
+            entity_id: [
+                source.new_value,
+                source.old_value,
+                datetime.fromtimestamp(source.last_updated, UTC).isoformat()
+                if source.last_updated
+                else None,
+            ]
+            for entity_id, source in self._sources.items()
+        }
+
+    # ------------------------------------------------------------------
+    def restore(self, data: dict[str, list[Any]], changed: Iterable[str]) -> None:
+        """Restore values of known sources from as_dict output."""
+
+        for entity_id, (new_value, old_value, last_updated) in data.items():
+            if (source := self._sources.get(entity_id)) is None:
+                continue
+
+            source.new_value = new_value
+            source.old_value = old_value
+
+            if last_updated:
+                source.last_updated = datetime.fromisoformat(last_updated).timestamp()
+
+            if source.change_filter is not None:
+                source.change_filter.reported(new_value)
+
+        for entity_id in changed:
+            if entity_id in self._sources:
+                self.changed[entity_id] = None
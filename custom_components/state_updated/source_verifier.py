@@ -0,0 +1,130 @@
+"""Source verifier.
+
+Checks once Home Assistant has started that the sources of all State
+updated helpers exist, in one pass instead of one started listener per
+helper. Helpers added after startup are verified right away.
+"""
+
+from collections.abc import Awaitable, Callable
+from itertools import count
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, State, callback
+from homeassistant.helpers import start
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from .component_api import ComponentApi
+
+DATA_SOURCE_VERIFIER: HassKey["SourceVerifier"] = HassKey(f"{DOMAIN}_source_verifier")
+
+# Called with the missing source entity ids
+SourcesVerifiedCallback = Callable[[list[str]], Awaitable[None]]
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_SOURCE_VERIFIER)
+def async_get_source_verifier(hass: HomeAssistant) -> "SourceVerifier":
+    """Get the source verifier shared by all entries."""
+    return SourceVerifier(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class SourceVerifier:
+    """Source verifier."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._pending: dict[int, tuple[ComponentApi, SourcesVerifiedCallback]] = {}
+        # Tokens of helpers not removed, a running pass skips removed ones
+        self._active: set[int] = set()
+        self._tokens = count()
+        self._scheduled: bool = False
+
+        self.passes: int = 0
+        self.verified: int = 0
+        self.verify_seconds: float = 0.0
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_add(
+        self, component_api: "ComponentApi", sources_verified: SourcesVerifiedCallback
+    ) -> CALLBACK_TYPE:
+        """Verify the sources of a helper with the next pass."""
+
+        token: int = next(self._tokens)
+        self._pending[token] = (component_api, sources_verified)
+        self._active.add(token)
+
+        if not self._scheduled:
+            # Runs right away, possibly eagerly, when already started
+            self._scheduled = True
+            start.async_at_started(self.hass, self._async_verify)
+
+        @callback
+        def remove() -> None:
+            """Remove from the pending or running pass."""
+            self._pending.pop(token, None)
+            self._active.discard(token)
+
+        return remove
+
+    # ------------------------------------------------------------------
+    async def _async_verify(self, _hass: HomeAssistant) -> None:
+        """Verify all pending helpers in one pass."""
+
+        self._scheduled = False
+        verifying = self._pending
+        self._pending = {}
+
+        start_time: float = perf_counter()
+        get_state: Callable[[str], State | None] = self.hass.states.get
+        results: list[tuple[int, list[str]]] = [
+            (
+                token,
+                [
+                    entity_id
+                    for entity_id in component_api.source_entity_ids
+                    if get_state(entity_id) is None
+                ],
+            )
+            for token, (component_api, _sources_verified) in verifying.items()
+        ]
+
+        self.passes += 1
+        self.verified += len(results)
+        self.verify_seconds += perf_counter() - start_time
+
+        for token, missing in results:
+            # Removed while an earlier helper was awaited
+            if token not in self._active:
+                continue
+
+            component_api, sources_verified = verifying[token]
+
+            # A failing helper must not keep the others from being verified
+            try:
+                await sources_verified(missing)
+            except Exception:
+                LOGGER.exception(
+                    "Error verifying sources of %s", component_api.entry.entry_id
+                )
+
+    # ------------------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Verifier statistics."""
+
+        return {
+            "passes": self.passes,
+            "verified": self.verified,
+            "verify_seconds": round(self.verify_seconds, 4),
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,251 @@
+"""State change dispatcher.
+
+One integration level listener per watched entity_id, routing state changed
+events to every State updated helper subscribed to that entity.
+"""
+
+from collections.abc import Callable, Iterable
+from itertools import count
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    EventStateChangedData,
+    async_track_state_change_event,
+)
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, LOGGER
+
+DATA_STATE_DISPATCHER: HassKey["StateChangeDispatcher"] = HassKey(
+    f"{DOMAIN}_state_dispatcher"
+)
+
+StateChangeSubscriber = Callable[[str, State | None, State | None], None]
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_STATE_DISPATCHER)
+def async_get_state_dispatcher(hass: HomeAssistant) -> "StateChangeDispatcher":
+    """Get the state change dispatcher shared by all entries."""
+    return StateChangeDispatcher(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class _Tracker:
+    """One async_track_state_change_event call covering one or more entity ids."""
+
+    __slots__ = ("entity_ids", "live", "unsub")
+
+    def __init__(self, entity_ids: list[str]) -> None:
+        """Init."""
+        self.entity_ids: tuple[str, ...] = tuple(entity_ids)
+        self.live: set[str] = set(entity_ids)
+        self.unsub: CALLBACK_TYPE | None = None
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class StateChangeDispatcher:
+    """State change dispatcher.
+
+    Subscribers are kept in a dict per entity_id, keyed by subscription token,
+    so subscribe and unsubscribe are O(1) per entity_id.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+
+        self._subscribers: dict[str, dict[int, StateChangeSubscriber]] = {}
+        self._trackers: dict[str, _Tracker] = {}
+        self._observers: list[StateChangeSubscriber] = []
+        self._tokens = count()
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of watched entity ids."""
+        return len(self._subscribers)
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_add_observer(self, observer: StateChangeSubscriber) -> CALLBACK_TYPE:
+        """Observe state changes of every watched entity id.
+
+        Observers are called before the subscribers, so caches derived from
+        the new state are up to date when subscribers run.
+        """
+
+        self._observers.append(observer)
+
+        @callback
+        def remove_observer() -> None:
+            """Remove observer."""
+            self._observers.remove(observer)
+
+        return remove_observer
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_subscribe(
+        self,
+        entity_ids: str | Iterable[str],
+        subscriber: StateChangeSubscriber,
+    ) -> "StateChangeSubscription":
+        """Subscribe to state changes for one or more entity ids.
+
+        Entity ids which are not watched yet are tracked with one
+        async_track_state_change_event call. The returned subscription
+        unsubscribes when called, and entity ids can be added and removed.
+        """
+
+        subscription = StateChangeSubscription(self, next(self._tokens), subscriber)
+        subscription.async_add(
+            [entity_ids] if isinstance(entity_ids, str) else entity_ids
+        )
+
+        return subscription
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_subscribe(
+        self, entity_ids: list[str], token: int, subscriber: StateChangeSubscriber
+    ) -> None:
+        """Add one subscription to entity_ids."""
+
+        new_entity_ids: list[str] = []
+
+        for entity_id in entity_ids:
+            if (subscribers := self._subscribers.get(entity_id)) is None:
+                subscribers = self._subscribers[entity_id] = {}
+
+                if (tracker := self._trackers.get(entity_id)) is not None:
+                    tracker.live.add(entity_id)
+                else:
+                    new_entity_ids.append(entity_id)
+
+            subscribers[token] = subscriber
+
+        if new_entity_ids:
+            tracker = _Tracker(new_entity_ids)
+            tracker.unsub = async_track_state_change_event(
+                self.hass, new_entity_ids, self._async_dispatch
+            )
+
+            for entity_id in new_entity_ids:
+                self._trackers[entity_id] = tracker
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_unsubscribe(self, entity_id: str, token: int) -> None:
+        """Remove one subscription from entity_id."""
+
+        if (subscribers := self._subscribers.get(entity_id)) is None:
+            return
+
+        subscribers.pop(token, None)
+
+        if subscribers:
+            return
+
+        del self._subscribers[entity_id]
+
+        tracker: _Tracker = self._trackers[entity_id]
+        tracker.live.discard(entity_id)
+
+        if tracker.live:
+            return
+
+        tracker.unsub()
+
+        for tracked_entity_id in tracker.entity_ids:
+            if self._trackers.get(tracked_entity_id) is tracker:
+                del self._trackers[tracked_entity_id]
+
+    # ------------------------------------------------------------------
+    @callback
+    def _async_dispatch(self, event: Event[EventStateChangedData]) -> None:
+        """Hand new and old state to every subscriber of the entity."""
+
+        entity_id: str = event.data["entity_id"]
+
+        if (subscribers := self._subscribers.get(entity_id)) is None:
+            return
+
+        new_state: State | None = event.data["new_state"]
+        old_state: State | None = event.data["old_state"]
+
+        # A failing helper must not keep the others from seeing the change
+        for observer in self._observers:
+            try:
+                observer(entity_id, new_state, old_state)
+            except Exception:
+                LOGGER.exception("Error observing state change of %s", entity_id)
+
+        for subscriber in list(subscribers.values()):
+            try:
+                subscriber(entity_id, new_state, old_state)
+            except Exception:
+                LOGGER.exception("Error handling state change of %s", entity_id)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class StateChangeSubscription:
+    """Subscription of one subscriber to a changing set of entity ids."""
+
+    __slots__ = ("_dispatcher", "entity_ids", "subscriber", "token")
+
+    def __init__(
+        self,
+        dispatcher: StateChangeDispatcher,
+        token: int,
+        subscriber: StateChangeSubscriber,
+    ) -> None:
+        """Init."""
+        self._dispatcher: StateChangeDispatcher = dispatcher
+        self.token: int = token
+        self.subscriber: StateChangeSubscriber = subscriber
+        self.entity_ids: dict[str, None] = {}
+
+    # ------------------------------------------------------------------
+    @callback
+    def __call__(self) -> None:
+        """Unsubscribe from all entity ids."""
+
+        for entity_id in self.entity_ids:
+            self._dispatcher._async_unsubscribe(entity_id, self.token)  # noqa: SLF001
+
+        self.entity_ids = {}
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_add(self, entity_ids: Iterable[str]) -> None:
+        """Add entity ids."""
+
+        new_entity_ids: list[str] = [
+            entity_id
+            for entity_id in dict.fromkeys(entity_ids)
+            if entity_id not in self.entity_ids
+        ]
+
+        if not new_entity_ids:
+            return
+
+        self.entity_ids.update(dict.fromkeys(new_entity_ids))
+        self._dispatcher._async_subscribe(  # noqa: SLF001
+            new_entity_ids, self.token, self.subscriber
+        )
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_remove(self, entity_ids: Iterable[str]) -> None:
+        """Remove entity ids."""
+
+        for entity_id in entity_ids:
+            if self.entity_ids.pop(entity_id, False) is None:
+                self._dispatcher._async_unsubscribe(  # noqa: SLF001
+                    entity_id, self.token
+                )
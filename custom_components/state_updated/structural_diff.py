@@ -0,0 +1,185 @@
+"""Structural diff.
+
+Change detection for dict and list values. A content hash of the new value
+is compared first, so an unchanged structure costs one hash and no deep
+equality. When it changed, only the changed paths are reported.
+"""
+
+from collections.abc import Mapping
+from hashlib import blake2b
+from typing import Any
+
+import orjson
+
+ATTR_CHANGED_KEYS = "changed_keys"
+ATTR_CHANGES = "changes"
+ATTR_VALUE_HASH = "value_hash"
+
+_HASH_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+# ------------------------------------------------------------------
+def content_hash(value: Any) -> int:
+    """Cheap content hash of a json like value."""
+
+    try:
+        return hash(orjson.dumps(value, option=_HASH_OPTIONS, default=str))
+    except TypeError:
+        return hash(repr(value))
+
+
+# ------------------------------------------------------------------
+def stable_hash(value: Any) -> str:
+    """Content hash which is stable across restarts, for persisting."""
+
+    try:
+        content: bytes = orjson.dumps(value, option=_HASH_OPTIONS, default=str)
+    except TypeError:
+        content = repr(value).encode()
+
+    return blake2b(content, digest_size=16).hexdigest()
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class LazyText:
+    """Value with unit as text, only made when a template renders it."""
+
+    __slots__ = ("unit", "value")
+
+    def __init__(self, value: Any, unit: str) -> None:
+        """Init."""
+        self.value: Any = value
+        self.unit: str = unit
+
+    # ------------------------------------------------------------------
+    def __str__(self) -> str:
+        """Text."""
+        return f"{self.value}{self.unit}"
+
+
+# ------------------------------------------------------------------
+def diff_paths(
+    old_value: Any, new_value: Any, prefix: str = ""
+) -> dict[str, dict[str, Any]]:
+    """Changed paths between old and new value.
+
+    Dicts are compared per key and lists per index, recursively, giving dotted
+    paths like "forecast.0.temperature". Anything else is compared as a
+    whole.
+    """
+
+    changes: dict[str, dict[str, Any]] = {}
+
+    if isinstance(old_value, Mapping) and isinstance(new_value, Mapping):
+        keys = list(new_value) + [key for key in old_value if key not in new_value]
+        items = (
+            (
+                key,
+                old_value.get(key),
+                new_value.get(key),
+                key in old_value,
+                key in new_value,
+            )
+            for key in keys
+        )
+    elif isinstance(old_value, list | tuple) and isinstance(new_value, list | tuple):
+        items = (
+            (
+                index,
+                old_value[index] if index < len(old_value) else None,
+                new_value[index] if index < len(new_value) else None,
+                index < len(old_value),
+                index < len(new_value),
+            )
+            for index in range(max(len(old_value), len(new_value)))
+        )
+    else:
+        if old_value != new_value:
+            changes[prefix] = {"old": old_value, "new": new_value}
+        return changes
+
+    for key, old_item, new_item, in_old, in_new in items:
+        if old_item is new_item and in_old == in_new:
+            continue
+
+        path: str = f"{prefix}.{key}" if prefix else str(key)
+
+        if in_old and in_new:
+            changes.update(diff_paths(old_item, new_item, path))
+        else:
+            changes[path] = {"old": old_item, "new": new_item}
+
+    return changes
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class StructuralDiff:
+    """Structural diff change filter.
+
+    Same interface as ChangeFilter. The hash of the last raw value and of the
+    last reported value are cached, so each event hashes its new value once.
+    """
+
+    __slots__ = (
+        "_raw_hash",
+        "_raw_value",
+        "_reported_hash",
+        "_reported_value",
+        "changes",
+    )
+
+    def __init__(self, reported_value: Any = None) -> None:
+        """Init."""
+        self._raw_value: Any = None
+        self._raw_hash: int | None = None
+        self._reported_value: Any = None
+        self._reported_hash: int | None = None
+
+        self.changes: dict[str, dict[str, Any]] = {}
+        self.reported(reported_value)
+
+    # ------------------------------------------------------------------
+    def _hash(self, value: Any) -> int:
+        """Content hash of value, using the cached hashes when possible."""
+
+        if value is self._raw_value and self._raw_hash is not None:
+            return self._raw_hash
+
+        if value is self._reported_value and self._reported_hash is not None:
+            return self._reported_hash
+
+        return content_hash(value)
+
+    # ------------------------------------------------------------------
+    @property
+    def changed_keys(self) -> list[str]:
+        """Changed paths of the last change."""
+        return list(self.changes)
+
+    # ------------------------------------------------------------------
+    def is_change(self, new_value: Any, old_value: Any) -> bool:
+        """Return True if new value is a change compared to old value."""
+
+        new_hash: int = self._hash(new_value)
+        old_hash: int = self._hash(old_value)
+
+        self._raw_value = new_value
+        self._raw_hash = new_hash
+
+        if new_hash == old_hash:
+            return False
+
+        if not (changes := diff_paths(old_value, new_value)):
+            return False
+
+        self.changes = changes
+        return True
+
+    # ------------------------------------------------------------------
+    def reported(self, value: Any) -> None:
+        """Remember the last reported value."""
+
+        self._reported_hash = self._hash(value)
+        self._reported_value = value
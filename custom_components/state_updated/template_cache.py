@@ -0,0 +1,99 @@
+"""Template cache.
+
+Compiled text templates shared by all State updated helpers, keyed by
+template source. Most helpers use the default template, so a change event
+only pays for the render.
+"""
+
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.template import Template
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, TEMPLATE_CACHE_MAX_SIZE
+
+DATA_TEMPLATE_CACHE: HassKey["TemplateCache"] = HassKey(f"{DOMAIN}_template_cache")
+
+
+# ------------------------------------------------------------------
+@callback
+@singleton(DATA_TEMPLATE_CACHE)
+def async_get_template_cache(hass: HomeAssistant) -> "TemplateCache":
+    """Get the template cache shared by all entries."""
+    return TemplateCache(hass)
+
+
+# ------------------------------------------------------------------
+# ------------------------------------------------------------------
+class TemplateCache:
+    """LRU cache of compiled templates."""
+
+    def __init__(
+        self, hass: HomeAssistant, max_size: int = TEMPLATE_CACHE_MAX_SIZE
+    ) -> None:
+        """Init."""
+        self.hass: HomeAssistant = hass
+        self.max_size: int = max_size
+
+        self._templates: OrderedDict[str, Template] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of cached templates."""
+        return len(self._templates)
+
+    # ------------------------------------------------------------------
+    def get(self, source: str) -> Template:
+        """Get compiled template for source.
+
+        Raises TemplateError if the template can not be compiled, in which case
+        nothing is cached.
+        """
+
+        if (template := self._templates.get(source)) is not None:
+            self._templates.move_to_end(source)
+            self.hits += 1
+            return template
+
+        self.misses += 1
+
+        template = Template(source, self.hass)
+        template.ensure_valid()
+
+        self._templates[source] = template
+
+        if len(self._templates) > self.max_size:
+            self._templates.popitem(last=False)
+            self.evictions += 1
+
+        return template
+
+    # ------------------------------------------------------------------
+    @callback
+    def async_invalidate(self, source: str | None = None) -> None:
+        """Invalidate one template, or all when source is None."""
+
+        if source is None:
+            self._templates.clear()
+            return
+
+        self._templates.pop(source, None)
+
+    # ------------------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        """Cache statistics."""
+
+        return {
+            "size": len(self._templates),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,6 @@
+"""Fixtures for State updated tests.
+
+Uses the hass fixture of pytest-homeassistant-custom-component.
+"""
+
+pytest_plugins = "pytest_homeassistant_custom_component"
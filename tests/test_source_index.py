@@ -0,0 +1,59 @@
+"""Tests of the source index."""
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.state_updated.source_index import SourceIndex, SourceMatcher
+
+
+# ------------------------------------------------------------------
+async def test_entity_without_unique_id_added(hass: HomeAssistant) -> None:
+    """A new entity without a unique id, not watched by a helper, is matched."""
+
+    index: SourceIndex = SourceIndex(hass)
+    matcher: SourceMatcher = SourceMatcher("sensor.*_battery")
+    changes: list[tuple[list[str], list[str]]] = []
+
+    assert index.async_match(matcher) == []
+    index.async_register(
+        matcher, [], lambda added, removed: changes.append((added, removed))
+    )
+
+    hass.states.async_set("sensor.phone_battery", "50")
+    hass.states.async_set("sensor.phone_signal", "3")
+    await hass.async_block_till_done()
+
+    assert changes == [(["sensor.phone_battery"], [])]
+    assert index.async_match(SourceMatcher("sensor.*_battery")) == [
+        "sensor.phone_battery"
+    ]
+
+
+# ------------------------------------------------------------------
+async def test_entity_without_unique_id_state_restored(hass: HomeAssistant) -> None:
+    """An entity losing its state briefly is matched again after a reload."""
+
+    hass.states.async_set("sensor.phone_battery", "50")
+
+    index: SourceIndex = SourceIndex(hass)
+    matcher: SourceMatcher = SourceMatcher("sensor.*_battery")
+    changes: list[tuple[list[str], list[str]]] = []
+
+    assert index.async_match(matcher) == ["sensor.phone_battery"]
+    unregister = index.async_register(
+        matcher,
+        ["sensor.phone_battery"],
+        lambda added, removed: changes.append((added, removed)),
+    )
+
+    hass.states.async_remove("sensor.phone_battery")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.phone_battery", "49")
+    await hass.async_block_till_done()
+
+    assert changes == [([], ["sensor.phone_battery"]), (["sensor.phone_battery"], [])]
+
+    # Reloaded helper, the cached set is used
+    unregister()
+    assert index.async_match(SourceMatcher("sensor.*_battery")) == [
+        "sensor.phone_battery"
+    ]